@@ -0,0 +1,243 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Autoplay bot module - plays the game with a lookahead search over placements
+"""
+
+import time
+from collections import OrderedDict, deque
+from tetromino import PieceState
+from move_generator import generate_placements, placement_key
+from board_evaluator import score_placements, weight_vector
+from game_engine import ACTION_HARD_DROP
+
+# Value of a position where the next piece cannot spawn
+_LOSS = -1e9
+
+class AutoplayBot:
+    """Class choosing placements with a beam search over the current and next pieces
+    
+    With depth 2 the bot searches the current piece and the known next piece;
+    each extra ply averages over the seven possible pieces after that
+    (expectimax). Searched values are cached in an LRU transposition table keyed
+    by the board hash, the piece and the remaining depth. With a ContourCache
+    the search only considers clean fits while the surface has any.
+    
+    In a game, think() spends up to frame_budget seconds once per rendered
+    frame and act() steps up to actions_per_act actions; the main loop calls
+    act() once per simulation tick, so the bot moves at the tick rate.
+    """
+    
+    def __init__(self, weights=None, depth=2, beam_width=6, move_budget=0.25,
+                 frame_budget=0.004, table_size=65536, actions_per_act=1, contour_cache=None):
+        """Initialize the bot"""
+        self.weights = weight_vector(weights)
+        self.depth = depth
+        self.beam_width = beam_width
+        self.move_budget = move_budget
+        self.frame_budget = frame_budget
+        self.table_size = table_size
+        self.actions_per_act = actions_per_act
+        self.contour_cache = contour_cache
+        
+        # Transposition table of (board hash, piece kind, depth) -> value
+        self.table = OrderedDict()
+        self.reset()
+    
+    def reset(self):
+        """Forget the piece being played, e.g. after a restart"""
+        self.table.clear()
+        self._pieces_locked = None
+        self._search = None
+        self._search_time = 0.0
+        self._ranking = []
+        self._path = deque()
+        self._expected = None
+    
+    def __call__(self, engine, rng=None):
+        """Get the actions for the current piece; usable as a SimulationFarm policy"""
+        placement = self.choose_placement(engine)
+        if placement is None:
+            return [ACTION_HARD_DROP]
+        return placement.path
+    
+    def choose_placement(self, engine):
+        """Search within the move budget and return the best reachable placement"""
+        ranking = []
+        search = self._search_moves(engine.game_board, engine.current_piece.to_state(),
+                                    engine.next_piece.shape_index, engine.spawn_x, ranking)
+        if not self._run(search, time.perf_counter() + self.move_budget):
+            search.close()
+        return self._pick(engine, ranking)
+    
+    def play_frame(self, engine):
+        """Think for up to one frame's budget, then step the engine along the chosen path"""
+        if not self.think(engine):
+            return []
+        return self.act(engine)
+    
+    def think(self, engine):
+        """Search and plan for up to one frame's budget; True once there is a path to follow"""
+        if engine.game_over:
+            return False
+        
+        # A new piece has spawned, so search its placements on a copy of the board
+        if engine.pieces_locked != self._pieces_locked:
+            if self._search is not None:
+                self._search.close()
+            self._pieces_locked = engine.pieces_locked
+            self._ranking = []
+            self._search = self._search_moves(engine.game_board.copy(), engine.current_piece.to_state(),
+                                              engine.next_piece.shape_index, engine.spawn_x, self._ranking)
+            self._search_time = 0.0
+            self._path.clear()
+        
+        if self._search is not None:
+            start = time.perf_counter()
+            deadline = start + min(self.frame_budget, self.move_budget - self._search_time)
+            finished = self._run(self._search, deadline)
+            self._search_time += time.perf_counter() - start
+            if not finished and self._search_time < self.move_budget:
+                return False
+            self._search.close()
+            self._search = None
+            
+            # Finding the path takes a move generation, so leave it to the next frame
+            return False
+        
+        # Plan the path, or plan again if gravity moved the piece since the bot last stepped it
+        if not self._path or (self._expected is not None and
+                              engine.current_piece.to_state() != self._expected):
+            self._plan(engine)
+        return True
+    
+    def act(self, engine):
+        """Step up to actions_per_act actions of the planned path, waiting for think() if the piece strayed"""
+        if (engine.game_over or self._search is not None or
+                engine.pieces_locked != self._pieces_locked or
+                (self._expected is not None and engine.current_piece.to_state() != self._expected)):
+            return []
+        
+        events = []
+        pieces_locked = engine.pieces_locked
+        for _ in range(self.actions_per_act):
+            if not self._path or engine.pieces_locked != pieces_locked:
+                break
+            events.extend(engine.step(self._path.popleft()))
+        self._expected = engine.current_piece.to_state()
+        return events
+    
+    def _plan(self, engine):
+        """Turn the ranking into a path from where the piece is now"""
+        placement = self._pick(engine, self._ranking)
+        self._path = deque(placement.path if placement is not None else [ACTION_HARD_DROP])
+        self._expected = None
+    
+    def _pick(self, engine, ranking):
+        """Get the best ranked placement the current piece can still reach"""
+        reachable = {placement_key(placement.piece): placement
+                     for placement in generate_placements(engine.game_board, engine.current_piece)}
+        for piece in ranking:
+            placement = reachable.get(placement_key(piece))
+            if placement is not None:
+                return placement
+        
+        # Nothing ranked is reachable any more, so take the best of the reachable placements;
+        # the contour cache is skipped here as its fits may no longer be reachable
+        if not reachable:
+            return None
+        placements = list(reachable.values())
+        scores, _, _ = score_placements(engine.game_board,
+                                        [placement.piece for placement in placements], self.weights)
+        return placements[scores.index(max(scores))]
+    
+    def _run(self, search, deadline):
+        """Advance a search until it finishes or the deadline passes; True if it finished"""
+        try:
+            while time.perf_counter() < deadline:
+                next(search)
+        except StopIteration:
+            return True
+        return False
+    
+    def _search_moves(self, board, piece, next_kind, spawn_x, ranking):
+        """Search the placements of a piece, keeping ranking ordered best first"""
+        self._spawn_x = spawn_x
+        children = self._children(board, piece)
+        ranking[:] = [landing for _, landing, _ in children]
+        if self.depth < 2:
+            return
+        yield
+        
+        # Searched candidates move ahead of the ones only ranked by their static score
+        searched = []
+        for index, (_, landing, reward) in enumerate(children[:self.beam_width]):
+            token = board.apply(landing)
+            try:
+                value = yield from self._value(board, next_kind, self.depth - 1)
+            finally:
+                board.revert(token)
+            searched.append((reward + value, -index, landing))
+            searched.sort(reverse=True)
+            ranking[:] = ([landing for _, _, landing in searched] +
+                          [landing for _, landing, _ in children[index + 1:]])
+            yield
+    
+    def _value(self, board, kind, depth):
+        """Get the value of placing a piece of kind (None when unknown) and depth - 1 after it"""
+        key = (board.hash, kind, depth)
+        value = self.table.get(key)
+        if value is not None:
+            self.table.move_to_end(key)
+            return value
+        
+        if kind is None:
+            # Average over the pieces that could come next
+            value = 0.0
+            for next_kind in range(7):
+                value += yield from self._value(board, next_kind, depth)
+            value /= 7
+        else:
+            children = self._children(board, PieceState(kind, 0, self._spawn_x, 0))
+            yield
+            if not children:
+                value = _LOSS
+            elif depth == 1:
+                value = children[0][0]
+            else:
+                value = _LOSS
+                for _, landing, reward in children[:self.beam_width]:
+                    token = board.apply(landing)
+                    try:
+                        child_value = yield from self._value(board, None, depth - 1)
+                    finally:
+                        board.revert(token)
+                    value = max(value, reward + child_value)
+                    yield
+        
+        self.table[key] = value
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+        return value
+    
+    def _children(self, board, piece):
+        """Score every placement of a piece, returning (score, landing, reward) best first
+        
+        The score is the full evaluation of the board after the placement; the
+        reward is only its landing height and lines cleared terms, which are the
+        part that belongs to the move rather than to the resulting board.
+        """
+        # Boards sharing a surface share their clean fits, so ask the contour cache first
+        landings = None
+        if self.contour_cache is not None:
+            landings = self.contour_cache.placements(board, piece.kind)
+        if landings is None:
+            landings = [placement.piece for placement in
+                        generate_placements(board, piece, include_paths=False)]
+        scores, heights, lines = score_placements(board, landings, self.weights)
+        
+        children = []
+        for score, landing, height, cleared in zip(scores, landings, heights, lines):
+            reward = self.weights[0] * height + self.weights[1] * cleared
+            children.append((score, landing, reward))
+        children.sort(key=lambda child: child[0], reverse=True)
+        return children
@@ -0,0 +1,298 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Batch engine module - advances many headless games at once with NumPy
+"""
+
+import numpy as np
+from tetromino import PIECE_BOUNDS, PIECE_ROW_MASKS
+from game_mechanics import (WALL_KICKS, LINE_POINTS, COMBO_POINTS, BACK_TO_BACK_POINTS,
+                            LINES_PER_LEVEL)
+from game_engine import (ACTION_MOVE_LEFT, ACTION_MOVE_RIGHT, ACTION_MOVE_DOWN,
+                         ACTION_ROTATE, ACTION_HARD_DROP, ACTION_GRAVITY)
+
+# Action codes accepted by BatchEngine.step, mapped to the GameEngine actions
+BATCH_ACTIONS = (
+    None,               # 0: do nothing
+    ACTION_MOVE_LEFT,   # 1
+    ACTION_MOVE_RIGHT,  # 2
+    ACTION_MOVE_DOWN,   # 3
+    ACTION_ROTATE,      # 4
+    ACTION_HARD_DROP,   # 5
+    ACTION_GRAVITY      # 6
+)
+NOOP, MOVE_LEFT, MOVE_RIGHT, MOVE_DOWN, ROTATE, HARD_DROP, GRAVITY = range(len(BATCH_ACTIONS))
+
+def _build_tables():
+    """Pack the rotation and kick tables into arrays indexed by [kind, rotation]"""
+    bounds = np.array(PIECE_BOUNDS, dtype=np.int64)
+    masks = np.zeros((7, 4, 4), dtype=np.int64)
+    kicks = np.zeros((7, 4, 5, 2), dtype=np.int64)
+    
+    for kind in range(7):
+        for rotation in range(4):
+            for i, mask in enumerate(PIECE_ROW_MASKS[kind][rotation]):
+                masks[kind, rotation, i] = mask
+            
+            # Clockwise kicks from this rotation; the O piece keeps a single (0, 0) test
+            offsets = WALL_KICKS.get((kind, rotation, (rotation + 1) % 4), ((0, 0),))
+            kicks[kind, rotation, :len(offsets)] = offsets
+            kicks[kind, rotation, len(offsets):] = offsets[-1]
+    
+    line_points = np.array([LINE_POINTS.get(lines, 0) for lines in range(5)], dtype=np.int64)
+    return bounds, masks, kicks, line_points
+
+# bounds[kind, rotation] -> (left, top, right, bottom), masks[kind, rotation] -> 4 row masks,
+# kicks[kind, rotation] -> 5 clockwise kick offsets, line_points[lines] -> base points
+_BOUNDS, _MASKS, _KICKS, _LINE_POINTS = _build_tables()
+
+class BatchEngine:
+    """Class stepping N games in lockstep, with the boards stored as N x height row bitmasks"""
+    
+    def __init__(self, count, width=10, height=20, seed=None, bags_per_chunk=16):
+        """Initialize the batch and start count new games"""
+        if width > 63:
+            raise ValueError("BatchEngine supports boards up to 63 columns wide")
+        
+        self.count = count
+        self.width = width
+        self.height = height
+        self.full_row = (1 << width) - 1
+        self.spawn_x = width // 2 - 1
+        self.bags_per_chunk = bags_per_chunk
+        self.rng = np.random.default_rng(seed)
+        self.env_ids = np.arange(count)
+        
+        # Smallest unsigned type that holds a row
+        if width <= 16:
+            row_dtype = np.uint16
+        elif width <= 32:
+            row_dtype = np.uint32
+        else:
+            row_dtype = np.uint64
+        self.boards = np.zeros((count, height), dtype=row_dtype)
+        
+        # Per-game piece and scoring state
+        self.kind = np.zeros(count, dtype=np.int64)
+        self.rotation = np.zeros(count, dtype=np.int64)
+        self.x = np.zeros(count, dtype=np.int64)
+        self.y = np.zeros(count, dtype=np.int64)
+        self.next_kind = np.zeros(count, dtype=np.int64)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.lines_cleared = np.zeros(count, dtype=np.int64)
+        self.level = np.ones(count, dtype=np.int64)
+        self.combo_count = np.zeros(count, dtype=np.int64)
+        self.back_to_back_tetris = np.zeros(count, dtype=bool)
+        self.pieces_locked = np.zeros(count, dtype=np.int64)
+        self.game_over = np.zeros(count, dtype=bool)
+        
+        # 7-bag piece sequences, one row per game
+        self.queue = np.zeros((count, 7 * bags_per_chunk), dtype=np.int64)
+        self.queue_pos = np.zeros(count, dtype=np.int64)
+        
+        self.reset()
+    
+    def reset(self, env_ids=None, piece_sequences=None):
+        """Start new games in the given slots, or in every slot
+        
+        piece_sequences optionally gives each game its first shape indices, one
+        row per game of up to 7 * bags_per_chunk kinds; shuffled bags follow them.
+        """
+        if env_ids is None:
+            env_ids = self.env_ids
+        env_ids = np.asarray(env_ids, dtype=np.int64)
+        
+        self.boards[env_ids] = 0
+        self.score[env_ids] = 0
+        self.lines_cleared[env_ids] = 0
+        self.level[env_ids] = 1
+        self.combo_count[env_ids] = 0
+        self.back_to_back_tetris[env_ids] = False
+        self.pieces_locked[env_ids] = 0
+        self.game_over[env_ids] = False
+        
+        self._fill_queue(env_ids)
+        if piece_sequences is not None:
+            self._load_sequences(env_ids, piece_sequences)
+        self.next_kind[env_ids] = self._take_kinds(env_ids)
+        self._spawn(env_ids)
+    
+    def _load_sequences(self, env_ids, piece_sequences):
+        """Put given piece sequences at the end of the queues and start from them"""
+        piece_sequences = np.asarray(piece_sequences, dtype=np.int64)
+        length = piece_sequences.shape[1]
+        if piece_sequences.shape[0] != len(env_ids) or length > self.queue.shape[1]:
+            raise ValueError(f"piece_sequences must be {len(env_ids)} rows of at most "
+                             f"{self.queue.shape[1]} kinds")
+        self.queue[env_ids, self.queue.shape[1] - length:] = piece_sequences
+        self.queue_pos[env_ids] = self.queue.shape[1] - length
+    
+    def _fill_queue(self, env_ids):
+        """Deal fresh shuffled bags to the given games"""
+        bags = np.broadcast_to(np.arange(7), (len(env_ids), self.bags_per_chunk, 7))
+        self.queue[env_ids] = self.rng.permuted(bags, axis=2).reshape(len(env_ids), -1)
+        self.queue_pos[env_ids] = 0
+    
+    def _take_kinds(self, env_ids):
+        """Take the next shape index from each game's queue"""
+        empty = env_ids[self.queue_pos[env_ids] >= self.queue.shape[1]]
+        if len(empty):
+            self._fill_queue(empty)
+        kinds = self.queue[env_ids, self.queue_pos[env_ids]]
+        self.queue_pos[env_ids] += 1
+        return kinds
+    
+    def _spawn(self, env_ids):
+        """Bring in the next piece for the given games and flag games that are over"""
+        self.kind[env_ids] = self.next_kind[env_ids]
+        self.rotation[env_ids] = 0
+        self.x[env_ids] = self.spawn_x
+        self.y[env_ids] = 0
+        self.next_kind[env_ids] = self._take_kinds(env_ids)
+        
+        blocked = ~self._fits(env_ids, self.rotation[env_ids], self.x[env_ids], self.y[env_ids])
+        self.game_over[env_ids[blocked]] = True
+    
+    def _fits(self, env_ids, rotation, x, y):
+        """Check, for each given game, if its piece fits at the given rotation and position"""
+        kind = self.kind[env_ids]
+        bounds = _BOUNDS[kind, rotation]
+        left = x + bounds[:, 0]
+        top = y + bounds[:, 1]
+        
+        fits = ((left >= 0) & (x + bounds[:, 2] < self.width) &
+                (top >= 0) & (y + bounds[:, 3] < self.height))
+        
+        # Out of bounds games are already rejected, so clip to keep indexing valid
+        shift = np.clip(left, 0, self.width - 1)
+        masks = _MASKS[kind, rotation]
+        for i in range(4):
+            row = np.clip(top + i, 0, self.height - 1)
+            cells = self.boards[env_ids, row].astype(np.int64)
+            fits &= (cells & (masks[:, i] << shift)) == 0
+        
+        return fits
+    
+    def step(self, actions):
+        """Apply one action per game; return (points scored, lines cleared, game over) arrays"""
+        actions = np.asarray(actions, dtype=np.int64)
+        points = np.zeros(self.count, dtype=np.int64)
+        lines = np.zeros(self.count, dtype=np.int64)
+        active = ~self.game_over
+        
+        for dx, action in ((-1, MOVE_LEFT), (1, MOVE_RIGHT)):
+            env_ids = self.env_ids[active & (actions == action)]
+            moved = self._fits(env_ids, self.rotation[env_ids], self.x[env_ids] + dx,
+                               self.y[env_ids])
+            self.x[env_ids[moved]] += dx
+        
+        env_ids = self.env_ids[active & (actions == ROTATE)]
+        if len(env_ids):
+            self._rotate(env_ids)
+        
+        # Soft drop and gravity move down one row, locking pieces that can't move
+        for action in (MOVE_DOWN, GRAVITY):
+            env_ids = self.env_ids[active & (actions == action)]
+            fall = self._fits(env_ids, self.rotation[env_ids], self.x[env_ids],
+                              self.y[env_ids] + 1)
+            self.y[env_ids[fall]] += 1
+            landed = env_ids[~fall]
+            if len(landed):
+                # A soft drop lock scores the piece's row as its drop height
+                drop_height = self.y[landed] if action == MOVE_DOWN else np.zeros(len(landed), np.int64)
+                self._lock(landed, drop_height, points, lines)
+        
+        env_ids = self.env_ids[active & (actions == HARD_DROP)]
+        if len(env_ids):
+            drop_height = self._drop_distance(env_ids)
+            self.y[env_ids] += drop_height
+            self._lock(env_ids, drop_height, points, lines)
+        
+        return points, lines, self.game_over.copy()
+    
+    def _rotate(self, env_ids):
+        """Rotate pieces clockwise, trying each wall kick in order"""
+        rotation = self.rotation[env_ids]
+        
+        # O piece doesn't rotate
+        new_rotation = np.where(self.kind[env_ids] == 3, rotation, (rotation + 1) % 4)
+        kicks = _KICKS[self.kind[env_ids], rotation]
+        pending = np.ones(len(env_ids), dtype=bool)
+        
+        for test in range(kicks.shape[1]):
+            dx = kicks[:, test, 0]
+            dy = kicks[:, test, 1]
+            fits = pending & self._fits(env_ids, new_rotation, self.x[env_ids] + dx,
+                                        self.y[env_ids] + dy)
+            rotated = env_ids[fits]
+            self.rotation[rotated] = new_rotation[fits]
+            self.x[rotated] += dx[fits]
+            self.y[rotated] += dy[fits]
+            pending &= ~fits
+            if not pending.any():
+                break
+    
+    def _drop_distance(self, env_ids):
+        """Get how many rows each piece can fall before it lands"""
+        distance = np.zeros(len(env_ids), dtype=np.int64)
+        falling = np.ones(len(env_ids), dtype=bool)
+        rotation = self.rotation[env_ids]
+        x = self.x[env_ids]
+        y = self.y[env_ids]
+        
+        while falling.any():
+            falling &= self._fits(env_ids, rotation, x, y + distance + 1)
+            distance += falling
+        
+        return distance
+    
+    def _lock(self, env_ids, drop_height, points, lines):
+        """Lock pieces, clear and score lines, then spawn the next pieces"""
+        kind = self.kind[env_ids]
+        rotation = self.rotation[env_ids]
+        bounds = _BOUNDS[kind, rotation]
+        masks = _MASKS[kind, rotation]
+        shift = self.x[env_ids] + bounds[:, 0]
+        top = self.y[env_ids] + bounds[:, 1]
+        
+        for i in range(4):
+            has_row = masks[:, i] != 0
+            rows = top[has_row] + i
+            games = env_ids[has_row]
+            self.boards[games, rows] |= (masks[has_row, i] << shift[has_row]).astype(self.boards.dtype)
+        self.pieces_locked[env_ids] += 1
+        
+        # Full rows are moved to the top by a stable sort, then emptied
+        full = self.boards[env_ids] == self.full_row
+        cleared = full.sum(axis=1)
+        clearing = cleared > 0
+        if clearing.any():
+            games = env_ids[clearing]
+            full = full[clearing]
+            order = np.argsort(~full, axis=1, kind='stable')
+            compacted = np.take_along_axis(self.boards[games], order, axis=1)
+            compacted[np.arange(self.height) < cleared[clearing, None]] = 0
+            self.boards[games] = compacted
+            
+            self._score(games, cleared[clearing], drop_height[clearing], points)
+            lines[games] = cleared[clearing]
+        
+        self._spawn(env_ids)
+    
+    def _score(self, env_ids, lines, drop_height, points):
+        """Score line clears with the same rules as GameMechanics.calculate_score"""
+        level = self.level[env_ids]
+        combo = self.combo_count[env_ids] + 1
+        tetris = lines == 4
+        
+        base_score = _LINE_POINTS[lines] * level
+        combo_bonus = COMBO_POINTS * combo * level
+        b2b_bonus = np.where(tetris & self.back_to_back_tetris[env_ids],
+                             BACK_TO_BACK_POINTS * level, 0)
+        total_score = base_score + combo_bonus + b2b_bonus + drop_height
+        
+        self.combo_count[env_ids] = combo
+        self.back_to_back_tetris[env_ids] = tetris
+        self.score[env_ids] += total_score
+        self.lines_cleared[env_ids] += lines
+        self.level[env_ids] = self.lines_cleared[env_ids] // LINES_PER_LEVEL + 1
+        points[env_ids] = total_score
@@ -0,0 +1,95 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Batch parity module - checks BatchEngine against GameEngine on identical piece sequences
+"""
+
+import argparse
+import random
+import numpy as np
+from piece_queue import PieceQueue
+from game_engine import GameEngine
+from batch_engine import BatchEngine, BATCH_ACTIONS
+from autoplay_bot import AutoplayBot
+
+# Batch action codes a random step picks from
+_RANDOM_ACTIONS = tuple(range(1, len(BATCH_ACTIONS)))
+ACTION_CODES = {action: code for code, action in enumerate(BATCH_ACTIONS)}
+
+def _game_state(engine):
+    """Get the GameEngine state that BatchEngine also tracks"""
+    piece = engine.current_piece
+    mechanics = engine.game_mechanics
+    return (list(engine.game_board.rows), piece.shape_index, piece.rotation, piece.x, piece.y,
+            engine.next_piece.shape_index, mechanics.score, mechanics.lines_cleared,
+            mechanics.level, mechanics.combo_count, mechanics.back_to_back_tetris,
+            engine.pieces_locked, engine.game_over)
+
+def _batch_state(batch, game):
+    """Get the state of one game of a BatchEngine, laid out like _game_state"""
+    return ([int(row) for row in batch.boards[game]], int(batch.kind[game]),
+            int(batch.rotation[game]), int(batch.x[game]), int(batch.y[game]),
+            int(batch.next_kind[game]), int(batch.score[game]), int(batch.lines_cleared[game]),
+            int(batch.level[game]), int(batch.combo_count[game]),
+            bool(batch.back_to_back_tetris[game]), int(batch.pieces_locked[game]),
+            bool(batch.game_over[game]))
+
+def check_parity(games=64, steps=3000, seed=0, noise=0.2, max_pieces=300, width=10, height=20):
+    """Play both engines side by side; return the first mismatch as (game, step) or None,
+    and the lines the games cleared in total
+    
+    A greedy bot keeps the games going long enough to clear lines, level up and
+    chain combos; each step is instead a random action with probability noise,
+    which also covers moves, rotations and soft drop locks the bot never makes.
+    """
+    rng = random.Random(seed)
+    seeds = [rng.getrandbits(32) for _ in range(games)]
+    engines = [GameEngine(width, height, game_seed) for game_seed in seeds]
+    bot = AutoplayBot(depth=1)
+    
+    # Give every batch game its GameEngine's piece sequence, long enough to never run out
+    bags = max_pieces // 7 + 2
+    batch = BatchEngine(games, width, height, seed, bags_per_chunk=bags)
+    sequences = []
+    for game_seed in seeds:
+        piece_queue = PieceQueue(game_seed)
+        sequences.append([piece_queue.next_kind() for _ in range(7 * bags)])
+    batch.reset(piece_sequences=sequences)
+    
+    paths = [[] for _ in range(games)]
+    for step in range(steps):
+        actions = np.zeros(games, dtype=np.int64)
+        for game, engine in enumerate(engines):
+            if engine.game_over or engine.pieces_locked >= max_pieces:
+                continue
+            if rng.random() < noise:
+                actions[game] = rng.choice(_RANDOM_ACTIONS)
+                paths[game] = []
+            else:
+                if not paths[game]:
+                    paths[game] = list(bot(engine))
+                actions[game] = ACTION_CODES[paths[game].pop(0)]
+            engine.step(BATCH_ACTIONS[actions[game]])
+        
+        batch.step(actions)
+        for game, engine in enumerate(engines):
+            if _game_state(engine) != _batch_state(batch, game):
+                return (game, step), int(batch.lines_cleared.sum())
+    
+    return None, int(batch.lines_cleared.sum())
+
+def main():
+    """Run the parity check from the command line"""
+    parser = argparse.ArgumentParser(description="Check BatchEngine against GameEngine")
+    parser.add_argument('--games', type=int, default=64, help="games played side by side")
+    parser.add_argument('--steps', type=int, default=3000, help="actions per game")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the games and actions")
+    parser.add_argument('--noise', type=float, default=0.2, help="chance of a random action")
+    args = parser.parse_args()
+    
+    mismatch, lines = check_parity(args.games, args.steps, args.seed, args.noise)
+    if mismatch is not None:
+        raise SystemExit(f"Game {mismatch[0]} differs after step {mismatch[1]}")
+    print(f"{args.games} games match over {args.steps} steps, clearing {lines} lines")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Board evaluator module - scores candidate boards on standard stacking features
+"""
+
+from tetromino import PIECE_BOUNDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Feature order used for weight vectors and feature matrices
+FEATURES = (
+    'landing_height',
+    'lines_cleared',
+    'aggregate_height',
+    'holes',
+    'bumpiness',
+    'row_transitions',
+    'column_transitions',
+    'wells'
+)
+
+# Default weights (El-Tetris); height and bumpiness are left for tuning
+DEFAULT_WEIGHTS = {
+    'landing_height': -4.500158825082766,
+    'lines_cleared': 3.4181268101392694,
+    'aggregate_height': 0.0,
+    'holes': -7.899265427351652,
+    'bumpiness': 0.0,
+    'row_transitions': -3.2178882868487753,
+    'column_transitions': -9.348695305445199,
+    'wells': -3.3855972247263626
+}
+
+def weight_vector(weights=None):
+    """Get the weights as a list in FEATURES order, filling in defaults"""
+    if weights is None:
+        weights = DEFAULT_WEIGHTS
+    if isinstance(weights, dict):
+        return [weights.get(name, DEFAULT_WEIGHTS[name]) for name in FEATURES]
+    return list(weights)
+
+def landing_height(board_height, piece):
+    """Get the height of the middle of a placed piece above the floor"""
+    _, top, _, bottom = PIECE_BOUNDS[piece.shape_index][piece.rotation]
+    return board_height - piece.y - (top + bottom) / 2
+
+def stack_boards(boards, width=None):
+    """Stack boards into an (N, height, width) bool array of occupied cells
+    
+    Accepts a sequence of GameBoards, a sequence of row-mask lists, an
+    (N, height) array of row masks or an (N, height, width) array of cells.
+    """
+    if np is None:
+        raise ImportError("NumPy is required to evaluate stacked boards")
+    
+    if isinstance(boards, np.ndarray) and boards.ndim == 3:
+        return boards.astype(bool, copy=False)
+    
+    if not isinstance(boards, np.ndarray):
+        boards = list(boards)
+        if boards and hasattr(boards[0], 'rows'):
+            width = boards[0].width
+            boards = [board.rows for board in boards]
+        boards = np.array(boards, dtype=np.int64)
+    if width is None:
+        raise ValueError("The board width is needed to unpack row masks")
+    
+    return ((boards[:, :, None] >> np.arange(width)) & 1).astype(bool)
+
+def compute_features(boards, landing_heights=None, lines_cleared=None, width=None):
+    """Compute the (N, len(FEATURES)) feature matrix of a stack of boards"""
+    filled = stack_boards(boards, width)
+    count, height, width = filled.shape
+    features = np.zeros((count, len(FEATURES)))
+    
+    if landing_heights is not None:
+        features[:, 0] = landing_heights
+    if lines_cleared is not None:
+        features[:, 1] = lines_cleared
+    
+    # Column heights from the top filled cell of each column
+    occupied = filled.any(axis=1)
+    first_row = filled.argmax(axis=1)
+    heights = np.where(occupied, height - first_row, 0)
+    features[:, 2] = heights.sum(axis=1)
+    
+    # Empty cells under the top of their column
+    under_top = np.arange(height)[None, :, None] >= (height - heights)[:, None, :]
+    features[:, 3] = (under_top & ~filled).sum(axis=(1, 2))
+    
+    features[:, 4] = np.abs(np.diff(heights, axis=1)).sum(axis=1)
+    
+    # Transitions, counting the walls and the floor as filled
+    walled = np.pad(filled, ((0, 0), (0, 0), (1, 1)), constant_values=True)
+    features[:, 5] = (walled[:, :, 1:] != walled[:, :, :-1]).sum(axis=(1, 2))
+    floored = np.pad(filled, ((0, 0), (0, 1), (0, 0)), constant_values=True)
+    features[:, 6] = (floored[:, 1:, :] != floored[:, :-1, :]).sum(axis=(1, 2))
+    
+    # Well cells are empty with both neighbours filled; a run of n scores 1 + 2 + ... + n
+    well = ~filled & walled[:, :, :-2] & walled[:, :, 2:]
+    run_total = np.cumsum(well, axis=1)
+    run_start = np.maximum.accumulate(np.where(well, 0, run_total), axis=1)
+    features[:, 7] = (run_total - run_start).sum(axis=(1, 2))
+    
+    return features
+
+def evaluate(boards, weights=None, landing_heights=None, lines_cleared=None, width=None):
+    """Score a stack of boards in one call; higher is better"""
+    features = compute_features(boards, landing_heights, lines_cleared, width)
+    return features @ np.array(weight_vector(weights))
+
+def compute_row_features(rows, width, landing=0.0, lines_cleared=0):
+    """Compute the feature list of a single board of row masks without NumPy"""
+    height = len(rows)
+    full_row = (1 << width) - 1
+    walled = full_row << 1 | 1 | 1 << (width + 1)
+    
+    heights = [0] * width
+    holes = 0
+    row_transitions = 0
+    column_transitions = 0
+    wells = 0
+    covered = 0
+    well_depth = [0] * width
+    previous = rows[0] if rows else 0
+    
+    for y, row in enumerate(rows):
+        # Columns reached for the first time set the column heights
+        new_columns = row & ~covered
+        while new_columns:
+            bit = new_columns & -new_columns
+            heights[bit.bit_length() - 1] = height - y
+            new_columns ^= bit
+        holes += (covered & ~row).bit_count()
+        covered |= row
+        
+        padded = row << 1 | 1 | 1 << (width + 1)
+        row_transitions += (padded ^ (padded >> 1)).bit_count() - 1
+        column_transitions += (row ^ previous).bit_count()
+        previous = row
+        
+        # Empty cells with both neighbours filled extend the wells below them
+        well_cells = ~padded & (padded << 1) & (padded >> 1) & walled
+        for x in range(width):
+            if well_cells >> (x + 1) & 1:
+                well_depth[x] += 1
+                wells += well_depth[x]
+            else:
+                well_depth[x] = 0
+    
+    column_transitions += (full_row & ~previous).bit_count()
+    bumpiness = sum(abs(heights[x] - heights[x + 1]) for x in range(width - 1))
+    return [landing, lines_cleared, sum(heights), holes, bumpiness,
+            row_transitions, column_transitions, wells]
+
+def evaluate_rows(rows, width, weights=None, landing=0.0, lines_cleared=0):
+    """Score a single board of row masks without NumPy; higher is better"""
+    features = compute_row_features(rows, width, landing, lines_cleared)
+    return sum(weight * value for weight, value in zip(weight_vector(weights), features))
+
+def score_placements(board, pieces, weights=None):
+    """Score the board after each placement; return (scores, landing heights, lines cleared) lists
+    
+    Each placement is applied to the GameBoard and reverted, so the board is left
+    as it was. The boards are scored in one NumPy call when NumPy is available.
+    """
+    rows = []
+    heights = []
+    lines = []
+    for piece in pieces:
+        token = board.apply(piece)
+        rows.append(board.rows[:])
+        heights.append(landing_height(board.height, piece))
+        lines.append(token['lines_cleared'])
+        board.revert(token)
+    if not rows:
+        return [], [], []
+    
+    if np is not None:
+        scores = evaluate(np.array(rows, dtype=np.int64), weights, heights, lines, board.width).tolist()
+    else:
+        scores = [evaluate_rows(board_rows, board.width, weights, height, cleared)
+                  for board_rows, height, cleared in zip(rows, heights, lines)]
+    return scores, heights, lines
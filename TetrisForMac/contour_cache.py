@@ -0,0 +1,89 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Contour cache module - caches the clean-fit placements of each stack surface
+"""
+
+from collections import OrderedDict
+from tetromino import PieceState, PIECE_BOUNDS, PIECE_ROW_MASKS, BOTTOM_PROFILES
+
+# Empty rows needed above the stack for every rotation and column to be reachable from spawn
+_CLEAR_ROWS = 4
+
+class ContourCache:
+    """Class caching the placements that sit flush on a surface, keyed by its contour
+    
+    A clean fit is a placement whose every column rests directly on the stack,
+    leaving no hole under it. Whether a piece fits cleanly only depends on the
+    height steps between the columns it covers, so boards that share a surface
+    profile share their clean fits, whatever lies below the surface.
+    """
+    
+    def __init__(self, width=10, max_step=4, size=4096):
+        """Initialize an empty cache"""
+        self.width = width
+        self.max_step = max_step
+        self.size = size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def clean_fits(self, profile, kind):
+        """Get the (rotation, x) of each distinct clean fit of a piece on a surface profile"""
+        key = (profile, kind)
+        fits = self.entries.get(key)
+        if fits is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return fits
+        
+        self.misses += 1
+        fits = []
+        seen = set()
+        for rotation in range(4):
+            left, _, right, _ = PIECE_BOUNDS[kind][rotation]
+            bottom = BOTTOM_PROFILES[kind][rotation]
+            steps = [bottom[i] - bottom[i + 1] for i in range(len(bottom) - 1)]
+            for column in range(self.width - (right - left)):
+                if list(profile[column:column + len(steps)]) != steps:
+                    continue
+                
+                # Rotations that cover the same cells land identically
+                cells = (column, PIECE_ROW_MASKS[kind][rotation])
+                if cells not in seen:
+                    seen.add(cells)
+                    fits.append((rotation, column - left))
+        
+        fits = tuple(fits)
+        self.entries[key] = fits
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return fits
+    
+    def placements(self, game_board, kind):
+        """Get the clean-fit piece states on a board, or None if the cache can't answer
+        
+        The cache can't answer when the stack is too high for every placement to
+        be reachable or when no placement fits cleanly; callers then fall back
+        to the move generator.
+        """
+        heights = game_board.column_heights
+        if max(heights) > game_board.height - _CLEAR_ROWS:
+            return None
+        
+        fits = self.clean_fits(game_board.get_surface_profile(self.max_step), kind)
+        if not fits:
+            return None
+        
+        # Rest each fit on its first column
+        states = []
+        for rotation, x in fits:
+            left = PIECE_BOUNDS[kind][rotation][0]
+            y = game_board.height - heights[x + left] - 1 - BOTTOM_PROFILES[kind][rotation][0]
+            states.append(PieceState(kind, rotation, x, y))
+        return states
+    
+    def clear(self):
+        """Empty the cache and its counters"""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,88 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Effect dispatcher module - turns a frame's game engine events into batched sound and animation work
+"""
+
+from game_engine import (EVENT_MOVE, EVENT_ROTATE, EVENT_LOCK, EVENT_LINE_CLEAR,
+                         EVENT_LEVEL_UP, EVENT_GAME_OVER)
+
+# Sound played for each event type
+EVENT_SOUNDS = {
+    EVENT_MOVE: 'move',
+    EVENT_ROTATE: 'rotate',
+    EVENT_LOCK: 'drop',
+    EVENT_LINE_CLEAR: 'clear_line',
+    EVENT_LEVEL_UP: 'level_up',
+    EVENT_GAME_OVER: 'game_over'
+}
+
+class EffectDispatcher:
+    """Class collecting game engine events and applying their side effects once per frame
+    
+    Subscribe queue() to the engine and call flush() once per frame. A frame's
+    locks become one particle batch and its cleared rows one animation batch,
+    each sound plays at most once per frame, and only the last level up is
+    shown. Events are counted by type in event_counts.
+    """
+    
+    def __init__(self, graphics, sound_effects, board_x, board_y, board_width, block_size):
+        """Initialize the dispatcher for a board drawn at (board_x, board_y)"""
+        self.graphics = graphics
+        self.sound_effects = sound_effects
+        self.board_x = board_x
+        self.board_y = board_y
+        self.board_width = board_width
+        self.block_size = block_size
+        self.events = []
+        self.event_counts = {}
+    
+    def queue(self, event):
+        """Hold an event until the next flush"""
+        self.events.append(event)
+    
+    def flush(self):
+        """Apply the side effects of the held events in batches and return how many there were"""
+        events = self.events
+        if not events:
+            return 0
+        
+        sounds = []
+        bursts = []
+        cleared_rows = []
+        level = None
+        half_block = self.block_size // 2
+        
+        for event in events:
+            event_type = event['type']
+            self.event_counts[event_type] = self.event_counts.get(event_type, 0) + 1
+            
+            sound = EVENT_SOUNDS.get(event_type)
+            if sound is not None and sound not in sounds:
+                sounds.append(sound)
+            
+            if event_type == EVENT_LOCK:
+                # Particles at the landing position
+                piece = event['piece']
+                color = piece.color
+                for x, y in piece.cells:
+                    bursts.append((self.board_x + (piece.x + x) * self.block_size + half_block,
+                                   self.board_y + (piece.y + y) * self.block_size + half_block,
+                                   color))
+            elif event_type == EVENT_LINE_CLEAR:
+                cleared_rows.extend(event['rows'])
+            elif event_type == EVENT_LEVEL_UP:
+                level = event['level']
+        
+        if bursts:
+            self.graphics.add_particle_bursts(bursts)
+        if cleared_rows:
+            self.graphics.add_line_clear_animations(
+                cleared_rows, self.board_x, self.board_y, self.board_width
+            )
+        if level is not None:
+            self.graphics.start_level_up_animation(level)
+        self.sound_effects.play_many(sounds)
+        
+        count = len(events)
+        events.clear()
+        return count
@@ -0,0 +1,58 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Fixed timestep module - runs the simulation at a fixed tick rate, whatever the frame rate
+"""
+
+# Nanoseconds per second. The accumulator holds elapsed nanoseconds times the tick
+# rate, so a tick is exactly this many units and rounding never loses time
+_NANOSECONDS = 1_000_000_000
+
+def interpolate(previous, current, alpha):
+    """Blend a value between the last two ticks for drawing between them"""
+    return previous + (current - previous) * alpha
+
+class FixedTimestep:
+    """Class turning variable frame times into whole fixed-length simulation ticks
+    
+    Each frame adds its real elapsed time to an accumulator and runs one tick
+    per full tick length in it, carrying the remainder to the next frame. A
+    frame runs at most max_ticks_per_frame ticks; time beyond that is dropped
+    so a stall can't snowball into ever longer catch-up frames.
+    """
+    
+    def __init__(self, tick_rate=60, max_ticks_per_frame=5):
+        """Initialize the timestep"""
+        self.tick_rate = tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.accumulator = 0
+        self.last_time = None
+        self.ticks = 0
+        self.dropped_ticks = 0
+    
+    def advance(self, now_ns):
+        """Add the time since the last call and return how many ticks to run"""
+        if self.last_time is None:
+            self.last_time = now_ns
+            return 0
+        
+        self.accumulator += (now_ns - self.last_time) * self.tick_rate
+        self.last_time = now_ns
+        ticks, self.accumulator = divmod(self.accumulator, _NANOSECONDS)
+        
+        # Catch up only so far, keeping the fraction of a tick for the next frame
+        if ticks > self.max_ticks_per_frame:
+            self.dropped_ticks += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+        
+        self.ticks += ticks
+        return ticks
+    
+    @property
+    def alpha(self):
+        """Get how far the clock is into the next tick, from 0 to 1"""
+        return self.accumulator / _NANOSECONDS
+    
+    def reset(self, now_ns=None):
+        """Drop the accumulated time, e.g. after a pause, restarting from now"""
+        self.accumulator = 0
+        self.last_time = now_ns
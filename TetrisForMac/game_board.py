@@ -3,74 +3,373 @@ Tetris-like Game for Mac with Apple Silicon
 GameBoard module - defines the GameBoard class for managing the game state
 """
 
+from tetromino import SHAPE_COLORS, PIECE_BOUNDS, PIECE_ROW_MASKS, BOTTOM_PROFILES
+from zobrist import CELL_KEYS, row_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Colors for the piece ids stored in a NumPy grid (0 is an empty cell)
+PIECE_PALETTE = [None] + SHAPE_COLORS
+PIECE_IDS = {color: piece_id for piece_id, color in enumerate(PIECE_PALETTE)}
+
 class GameBoard:
     """Class representing the game board"""
     
-    def __init__(self, width, height):
+    def __init__(self, width, height, use_numpy=False):
         """Initialize a new game board"""
+        if use_numpy and np is None:
+            raise ImportError("NumPy is required for a NumPy-backed game board")
+        
         self.width = width
         self.height = height
-        self.board = [[None for _ in range(width)] for _ in range(height)]
+        self.use_numpy = use_numpy
+        self.full_row = (1 << width) - 1
+        self.board = self._create_grid()
+        
+        # Bitboard occupancy: one int per row, bit x set when column x is filled
+        self.rows = [0] * height
+        
+        # Number of filled cells per row and the rows filled by the last locks
+        self.row_counts = [0] * height
+        self.full_rows = []
+        
+        # Skyline: number of rows from the floor to the top block of each column
+        self.column_heights = [0] * width
+        
+        # Zobrist hash of the locked cells, kept per row so line clears stay cheap
+        self.row_hashes = [0] * height
+        self.hash = 0
+    
+    def _create_grid(self):
+        """Create an empty grid of colors, or of piece ids when using NumPy"""
+        if self.use_numpy:
+            return np.zeros((self.height, self.width), dtype=np.uint8)
+        return [[None for _ in range(self.width)] for _ in range(self.height)]
+    
+    def get_cell_color(self, x, y):
+        """Get the color of the block at the given cell, or None if it is empty"""
+        if self.use_numpy:
+            return PIECE_PALETTE[self.board[y, x]]
+        return self.board[y][x]
     
     def is_valid_position(self, tetromino, dx=0, dy=0):
         """Check if the tetromino can be placed at the given position"""
-        for y, row in enumerate(tetromino.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    # Calculate the position on the board
-                    board_x = tetromino.x + x + dx
-                    board_y = tetromino.y + y + dy
-                    
-                    # Check if the position is out of bounds
-                    if (board_x < 0 or board_x >= self.width or 
-                        board_y < 0 or board_y >= self.height):
-                        return False
-                    
-                    # Check if the position is already occupied
-                    if board_y >= 0 and self.board[board_y][board_x]:
-                        return False
+        left, top, right, bottom = PIECE_BOUNDS[tetromino.shape_index][tetromino.rotation]
+        masks = PIECE_ROW_MASKS[tetromino.shape_index][tetromino.rotation]
+        x = tetromino.x + dx + left
+        y = tetromino.y + dy + top
+        
+        # Check if the piece's bounding box is out of bounds
+        if (x < 0 or tetromino.x + dx + right >= self.width or
+                y < 0 or tetromino.y + dy + bottom >= self.height):
+            return False
+        
+        # Check if any occupied cell overlaps the stack
+        rows = self.rows
+        for mask in masks:
+            if rows[y] & (mask << x):
+                return False
+            y += 1
         
         return True
     
+    def find_valid_offset(self, tetromino, offsets):
+        """Get the first (dx, dy) offset where the tetromino fits, or None"""
+        left, top, right, bottom = PIECE_BOUNDS[tetromino.shape_index][tetromino.rotation]
+        masks = PIECE_ROW_MASKS[tetromino.shape_index][tetromino.rotation]
+        rows = self.rows
+        
+        for dx, dy in offsets:
+            x = tetromino.x + dx
+            y = tetromino.y + dy + top
+            if (x + left < 0 or x + right >= self.width or
+                    y < 0 or tetromino.y + dy + bottom >= self.height):
+                continue
+            
+            x += left
+            for mask in masks:
+                if rows[y] & (mask << x):
+                    break
+                y += 1
+            else:
+                return (dx, dy)
+        
+        return None
+    
+    def get_drop_distance(self, tetromino):
+        """Get how many rows the tetromino can fall before it lands"""
+        x = tetromino.x + PIECE_BOUNDS[tetromino.shape_index][tetromino.rotation][0]
+        distance = self.height
+        
+        for column, bottom in enumerate(BOTTOM_PROFILES[tetromino.shape_index][tetromino.rotation]):
+            if not 0 <= x + column < self.width:
+                return self._step_drop_distance(tetromino)
+            
+            # Gap between the piece's lowest cell and the top block of the column
+            gap = self.height - self.column_heights[x + column] - tetromino.y - bottom - 1
+            if gap < 0:
+                # The piece is tucked under an overhang, so the skyline doesn't apply
+                return self._step_drop_distance(tetromino)
+            distance = min(distance, gap)
+        
+        return distance
+    
+    def get_surface_profile(self, max_step=4):
+        """Get the height steps between neighbouring columns, clamped to +/-max_step"""
+        heights = self.column_heights
+        return tuple(max(-max_step, min(max_step, heights[x + 1] - heights[x]))
+                     for x in range(self.width - 1))
+    
+    def _step_drop_distance(self, tetromino):
+        """Get the drop distance by testing one row at a time"""
+        distance = 0
+        while self.is_valid_position(tetromino, dy=distance + 1):
+            distance += 1
+        return distance
+    
     def lock_piece(self, tetromino):
         """Lock the tetromino in place on the board"""
-        for y, row in enumerate(tetromino.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    # Calculate the position on the board
-                    board_x = tetromino.x + x
-                    board_y = tetromino.y + y
-                    
-                    # Only place the piece if it's within the board
-                    if (0 <= board_x < self.width and 
-                        0 <= board_y < self.height):
-                        self.board[board_y][board_x] = tetromino.color
+        self._place(tetromino)
     
-    def clear_lines(self):
-        """Clear completed lines and return the number of lines cleared"""
-        lines_cleared = 0
-        y = self.height - 1
-        while y >= 0:
-            # Check if the line is complete
-            if all(self.board[y]):
-                lines_cleared += 1
+    def _place(self, tetromino):
+        """Write the tetromino's cells and return the (row, mask) pairs that were set"""
+        placed = []
+        left, top, _, _ = PIECE_BOUNDS[tetromino.shape_index][tetromino.rotation]
+        masks = PIECE_ROW_MASKS[tetromino.shape_index][tetromino.rotation]
+        x = tetromino.x + left
+        board_y = tetromino.y + top
+        value = tetromino.shape_index + 1 if self.use_numpy else tetromino.color
+        heights = self.column_heights
+        cell_keys = CELL_KEYS[tetromino.shape_index]
+        
+        for mask in masks:
+            # Only place the piece if it's within the board
+            if 0 <= board_y < self.height:
+                row_mask = (mask << x if x >= 0 else mask >> -x) & self.full_row
+                row_mask &= ~self.rows[board_y]
+                self.rows[board_y] |= row_mask
+                placed.append((board_y, row_mask))
                 
-                # Move all lines above down
-                for y2 in range(y, 0, -1):
-                    self.board[y2] = self.board[y2 - 1][:]
+                # Track fill counts so full rows are known without a scan
+                self.row_counts[board_y] += row_mask.bit_count()
+                if self.row_counts[board_y] == self.width:
+                    self.full_rows.append(board_y)
                 
-                # Clear the top line
-                self.board[0] = [None for _ in range(self.width)]
+                # Paint the color (or piece id) of each newly set bit
+                row = self.board[board_y]
+                cell_height = self.height - board_y
+                row_hash = self.row_hashes[board_y]
+                self.hash ^= row_key(board_y, row_hash)
+                while row_mask:
+                    bit = row_mask & -row_mask
+                    column = bit.bit_length() - 1
+                    row[column] = value
+                    row_hash ^= cell_keys[column]
+                    if cell_height > heights[column]:
+                        heights[column] = cell_height
+                    row_mask ^= bit
+                self.row_hashes[board_y] = row_hash
+                self.hash ^= row_key(board_y, row_hash)
+            board_y += 1
+        
+        return placed
+    
+    def apply(self, placement):
+        """Lock a piece and clear lines, returning a token that undoes both"""
+        pending_rows = self.full_rows[:]
+        column_heights = self.column_heights[:]
+        board_hash = self.hash
+        placed = self._place(placement)
+        
+        # Keep the contents of the rows about to be cleared
+        full_rows = sorted(self.full_rows)
+        if self.use_numpy:
+            cleared_cells = self.board[full_rows]
+        else:
+            cleared_cells = [self.board[y][:] for y in full_rows]
+        
+        return {
+            'shape_index': placement.shape_index,
+            'placed': placed,
+            'full_rows': full_rows,
+            'cleared_cells': cleared_cells,
+            'cleared_hashes': [self.row_hashes[y] for y in full_rows],
+            'pending_rows': pending_rows,
+            'column_heights': column_heights,
+            'hash': board_hash,
+            'lines_cleared': self.clear_lines()
+        }
+    
+    def revert(self, token):
+        """Undo an apply() call; tokens must be reverted in reverse order"""
+        full_rows = token['full_rows']
+        lines_cleared = len(full_rows)
+        
+        if lines_cleared:
+            # Put the cleared rows back where they were
+            if self.use_numpy:
+                kept = np.ones(self.height, dtype=bool)
+                kept[full_rows] = False
+                self.board[kept] = self.board[lines_cleared:].copy()
+                self.board[full_rows] = token['cleared_cells']
             else:
-                y -= 1
+                restored = self.board[:lines_cleared]
+                del self.board[:lines_cleared]
+                for y, row, cells in zip(full_rows, restored, token['cleared_cells']):
+                    row[:] = cells
+                    self.board.insert(y, row)
+            
+            del self.rows[:lines_cleared]
+            del self.row_counts[:lines_cleared]
+            del self.row_hashes[:lines_cleared]
+            for y, row_hash in zip(full_rows, token['cleared_hashes']):
+                self.rows.insert(y, self.full_row)
+                self.row_counts.insert(y, self.width)
+                self.row_hashes.insert(y, row_hash)
+        
+        # Remove the cells of the locked piece
+        empty = 0 if self.use_numpy else None
+        cell_keys = CELL_KEYS[token['shape_index']]
+        for y, mask in token['placed']:
+            self.rows[y] &= ~mask
+            self.row_counts[y] -= mask.bit_count()
+            row = self.board[y]
+            while mask:
+                bit = mask & -mask
+                column = bit.bit_length() - 1
+                row[column] = empty
+                self.row_hashes[y] ^= cell_keys[column]
+                mask ^= bit
         
+        self.full_rows = token['pending_rows']
+        self.column_heights = token['column_heights']
+        self.hash = token['hash']
+    
+    def clear_lines(self):
+        """Clear completed lines and return the number of lines cleared"""
+        lines_cleared = len(self.full_rows)
+        if not lines_cleared:
+            return 0
+        
+        if self.use_numpy:
+            self._clear_lines_numpy()
+        else:
+            # Move the cleared row objects to the top instead of copying rows down
+            cleared = []
+            for y in sorted(self.full_rows, reverse=True):
+                row = self.board.pop(y)
+                for x in range(self.width):
+                    row[x] = None
+                cleared.append(row)
+            self.board[0:0] = cleared
+        
+        self._compact_row_state()
+        self._update_column_heights()
         return lines_cleared
     
+    def _compact_row_state(self):
+        """Remove the full rows from the per-row masks, fill counts and hashes"""
+        # Only rows down to the lowest cleared one change position
+        lowest = max(self.full_rows)
+        for y in range(lowest + 1):
+            self.hash ^= row_key(y, self.row_hashes[y])
+        
+        for y in sorted(self.full_rows, reverse=True):
+            del self.rows[y]
+            del self.row_counts[y]
+            del self.row_hashes[y]
+        
+        lines_cleared = len(self.full_rows)
+        self.rows[0:0] = [0] * lines_cleared
+        self.row_counts[0:0] = [0] * lines_cleared
+        self.row_hashes[0:0] = [0] * lines_cleared
+        self.full_rows = []
+        
+        for y in range(lowest + 1):
+            self.hash ^= row_key(y, self.row_hashes[y])
+    
+    def _update_column_heights(self):
+        """Recompute the skyline from the row masks"""
+        heights = [0] * self.width
+        remaining = self.full_row
+        
+        for y, row in enumerate(self.rows):
+            found = row & remaining
+            while found:
+                bit = found & -found
+                heights[bit.bit_length() - 1] = self.height - y
+                found ^= bit
+            remaining &= ~row
+            if not remaining:
+                break
+        
+        self.column_heights = heights
+    
+    def _clear_lines_numpy(self):
+        """Clear completed lines of a NumPy grid with a single compaction pass"""
+        full = self.board.all(axis=1)
+        lines_cleared = int(np.count_nonzero(full))
+        
+        self.board[lines_cleared:] = self.board[~full]
+        self.board[:lines_cleared] = 0
+    
     def is_game_over(self):
         """Check if the game is over (pieces stacked to the top)"""
         # Check if any cell in the top row is filled
-        return any(self.board[0])
+        return self.rows[0] != 0
     
     def reset(self):
         """Reset the game board"""
-        self.board = [[None for _ in range(self.width)] for _ in range(self.height)]
+        self.board = self._create_grid()
+        self.rows = [0] * self.height
+        self.row_counts = [0] * self.height
+        self.full_rows = []
+        self.column_heights = [0] * self.width
+        self.row_hashes = [0] * self.height
+        self.hash = 0
+    
+    def get_cells(self):
+        """Get the grid as rows of piece ids, 0 for an empty cell"""
+        if self.use_numpy:
+            return self.board.tolist()
+        return [[PIECE_IDS[color] for color in row] for row in self.board]
+    
+    def set_cells(self, cells):
+        """Replace the grid with rows of piece ids and rebuild the incremental state"""
+        self.reset()
+        for y, cell_row in enumerate(cells):
+            row = self.board[y]
+            row_mask = 0
+            row_hash = 0
+            for x, piece_id in enumerate(cell_row):
+                if piece_id:
+                    row[x] = piece_id if self.use_numpy else PIECE_PALETTE[piece_id]
+                    row_mask |= 1 << x
+                    row_hash ^= CELL_KEYS[piece_id - 1][x]
+            
+            self.rows[y] = row_mask
+            self.row_counts[y] = row_mask.bit_count()
+            if row_mask == self.full_row:
+                self.full_rows.append(y)
+            self.row_hashes[y] = row_hash
+            self.hash ^= row_key(y, row_hash)
+        
+        self._update_column_heights()
+    
+    def copy(self):
+        """Get an independent copy of the board, including its incremental state"""
+        board = GameBoard(self.width, self.height, use_numpy=self.use_numpy)
+        if self.use_numpy:
+            board.board = self.board.copy()
+        else:
+            board.board = [row[:] for row in self.board]
+        board.rows = self.rows[:]
+        board.row_counts = self.row_counts[:]
+        board.full_rows = self.full_rows[:]
+        board.column_heights = self.column_heights[:]
+        board.row_hashes = self.row_hashes[:]
+        board.hash = self.hash
+        return board
@@ -0,0 +1,273 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Game engine module - runs the game rules headlessly, without pygame
+"""
+
+from game_board import GameBoard
+from game_mechanics import GameMechanics
+from piece_queue import PieceQueue
+from tetromino import Tetromino
+
+# Actions accepted by GameEngine.step
+ACTION_MOVE_LEFT = 'move_left'
+ACTION_MOVE_RIGHT = 'move_right'
+ACTION_MOVE_DOWN = 'move_down'
+ACTION_ROTATE = 'rotate'
+ACTION_HARD_DROP = 'hard_drop'
+ACTION_GRAVITY = 'gravity'
+
+# Simulation ticks per second; gravity is counted in ticks by GameEngine.tick
+TICK_RATE = 60
+
+# Player actions in the order the main loop applies them within a frame
+PLAYER_ACTIONS = (
+    ACTION_MOVE_LEFT,
+    ACTION_MOVE_RIGHT,
+    ACTION_MOVE_DOWN,
+    ACTION_ROTATE,
+    ACTION_HARD_DROP
+)
+
+# Events produced by GameEngine.step
+EVENT_MOVE = 'move'              # Player moved the piece
+EVENT_FALL = 'fall'              # Gravity moved the piece down
+EVENT_ROTATE = 'rotate'          # Piece rotated, possibly with a wall kick
+EVENT_LOCK = 'lock'              # Piece locked onto the board
+EVENT_LINE_CLEAR = 'line_clear'  # Lines were cleared and scored
+EVENT_LEVEL_UP = 'level_up'      # Level increased
+EVENT_SPAWN = 'spawn'            # A new piece entered the board
+EVENT_GAME_OVER = 'game_over'    # The new piece could not be placed
+
+class GameEngine:
+    """Class running the game rules with a step(action) -> events API"""
+    
+    def __init__(self, width=10, height=20, seed=None, use_numpy=False):
+        """Initialize the engine and start a new game"""
+        self.width = width
+        self.height = height
+        self.use_numpy = use_numpy
+        self.spawn_x = width // 2 - 1
+        
+        # Listeners as (callback, event types or None for all) pairs
+        self.listeners = []
+        
+        # Optional ReplayRecorder that logs every action stepped into the engine
+        self.recorder = None
+        
+        self.reset(seed)
+    
+    def reset(self, seed=None):
+        """Start a new game, keeping the subscribed listeners"""
+        self.game_board = GameBoard(self.width, self.height, use_numpy=self.use_numpy)
+        self.game_mechanics = GameMechanics(self.game_board)
+        self.piece_queue = PieceQueue(seed)
+        self.seed = self.piece_queue.seed
+        
+        self.current_piece = self.piece_queue.next_piece(self.spawn_x, 0)
+        self.next_piece = self.piece_queue.next_piece(self.spawn_x, 0)
+        self.game_over = False
+        self.pieces_locked = 0
+        self.last_action_rotated = False
+        self.gravity_counter = 0
+    
+    def snapshot(self):
+        """Get a compact copy of the game state that restore() can return to"""
+        mechanics = self.game_mechanics
+        return {
+            'cells': bytes(piece_id for row in self.game_board.get_cells() for piece_id in row),
+            'mechanics': (mechanics.score, mechanics.level, mechanics.lines_cleared,
+                          mechanics.combo_count, mechanics.back_to_back_tetris),
+            'queue': self.piece_queue.get_state(),
+            'seed': self.seed,
+            'current_piece': self.current_piece.to_state(),
+            'next_piece': self.next_piece.to_state(),
+            'game_over': self.game_over,
+            'pieces_locked': self.pieces_locked,
+            'last_action_rotated': self.last_action_rotated,
+            'gravity_counter': self.gravity_counter
+        }
+    
+    def restore(self, snapshot):
+        """Return to a snapshot, keeping the subscribed listeners"""
+        cells = snapshot['cells']
+        self.game_board.set_cells([cells[y * self.width:(y + 1) * self.width]
+                                   for y in range(self.height)])
+        mechanics = self.game_mechanics
+        (mechanics.score, mechanics.level, mechanics.lines_cleared,
+         mechanics.combo_count, mechanics.back_to_back_tetris) = snapshot['mechanics']
+        
+        self.piece_queue = PieceQueue(snapshot['seed'])
+        self.piece_queue.set_state(snapshot['queue'])
+        self.seed = snapshot['seed']
+        self.current_piece = Tetromino.from_state(snapshot['current_piece'])
+        self.next_piece = Tetromino.from_state(snapshot['next_piece'])
+        self.game_over = snapshot['game_over']
+        self.pieces_locked = snapshot['pieces_locked']
+        self.last_action_rotated = snapshot['last_action_rotated']
+        self.gravity_counter = snapshot['gravity_counter']
+    
+    def subscribe(self, callback, event_types=None):
+        """Call callback(event) for every event, or only for the given event types"""
+        if event_types is not None:
+            event_types = frozenset(event_types)
+        self.listeners.append((callback, event_types))
+    
+    def unsubscribe(self, callback):
+        """Stop calling a subscribed callback"""
+        self.listeners = [(listener, types) for listener, types in self.listeners
+                          if listener != callback]
+    
+    @property
+    def fall_speed(self):
+        """Get the gravity interval in seconds for the current level"""
+        return max(0.05, 0.5 - (self.game_mechanics.level - 1) * 0.05)
+    
+    @property
+    def gravity_ticks(self):
+        """Get the gravity interval in simulation ticks for the current level"""
+        return max(1, round(self.fall_speed * TICK_RATE))
+    
+    def tick(self):
+        """Advance gravity by one simulation tick and return the events it produced"""
+        if self.game_over:
+            return []
+        
+        # Keep the ticks past the interval so gravity never loses time
+        self.gravity_counter += 1
+        if self.gravity_counter < self.gravity_ticks:
+            return []
+        self.gravity_counter -= self.gravity_ticks
+        return self.step(ACTION_GRAVITY)
+    
+    def get_ghost_y(self):
+        """Get the row where the current piece would land"""
+        return self.game_mechanics.get_ghost_piece_position(self.current_piece)
+    
+    def get_state_hash(self):
+        """Get the hash of the full game state"""
+        return self.game_mechanics.get_state_hash(self.current_piece, self.next_piece)
+    
+    def step(self, action):
+        """Apply one action and return the list of events it produced"""
+        events = []
+        if self.game_over:
+            return events
+        if self.recorder is not None:
+            self.recorder.record_action(action)
+        
+        if action == ACTION_MOVE_LEFT:
+            self._move(events, -1)
+        elif action == ACTION_MOVE_RIGHT:
+            self._move(events, 1)
+        elif action == ACTION_MOVE_DOWN:
+            self._move_down(events, EVENT_MOVE)
+        elif action == ACTION_ROTATE:
+            self._rotate(events)
+        elif action == ACTION_HARD_DROP:
+            self._hard_drop(events)
+        elif action == ACTION_GRAVITY:
+            self._move_down(events, EVENT_FALL)
+        else:
+            raise ValueError(f"Unknown action: {action}")
+        
+        self._dispatch(events)
+        return events
+    
+    def _dispatch(self, events):
+        """Hand the events to the subscribed listeners"""
+        for callback, event_types in self.listeners:
+            for event in events:
+                if event_types is None or event['type'] in event_types:
+                    callback(event)
+    
+    def _move(self, events, dx):
+        """Move the piece sideways if possible"""
+        if self.game_board.is_valid_position(self.current_piece, dx=dx):
+            self.current_piece.x += dx
+            self.last_action_rotated = False
+            events.append({'type': EVENT_MOVE, 'piece': self.current_piece.to_state()})
+    
+    def _move_down(self, events, event_type):
+        """Move the piece down one row, locking it if it can't move"""
+        if self.game_board.is_valid_position(self.current_piece, dy=1):
+            self.current_piece.y += 1
+            self.last_action_rotated = False
+            events.append({'type': event_type, 'piece': self.current_piece.to_state()})
+        elif event_type == EVENT_MOVE:
+            # A soft drop lock scores the piece's row as its drop height
+            self._lock_piece(events, self.current_piece.y)
+        else:
+            self._lock_piece(events, 0)
+    
+    def _rotate(self, events):
+        """Rotate the piece clockwise, trying wall kicks if it collides"""
+        piece = self.current_piece
+        piece.rotate()
+        
+        # Check if rotation is valid, if not try wall kick
+        if (self.game_board.is_valid_position(piece) or
+                self.game_mechanics.perform_wall_kick(piece, True)):
+            self.last_action_rotated = True
+            events.append({'type': EVENT_ROTATE, 'piece': piece.to_state()})
+        else:
+            # Rotate back if wall kick failed
+            piece.rotate(clockwise=False)
+    
+    def _hard_drop(self, events):
+        """Drop the piece to the bottom and lock it"""
+        drop_height = self.game_board.get_drop_distance(self.current_piece)
+        self.current_piece.y += drop_height
+        if drop_height:
+            self.last_action_rotated = False
+        self._lock_piece(events, drop_height)
+    
+    def _lock_piece(self, events, drop_height):
+        """Lock the piece, clear and score lines, then spawn the next piece"""
+        piece = self.current_piece
+        board = self.game_board
+        mechanics = self.game_mechanics
+        t_spin = self.last_action_rotated and mechanics.is_t_spin(piece, board)
+        
+        board.lock_piece(piece)
+        self.pieces_locked += 1
+        cleared_rows = sorted(board.full_rows)
+        events.append({
+            'type': EVENT_LOCK,
+            'piece': piece.to_state(),
+            'drop_height': drop_height,
+            't_spin': t_spin
+        })
+        
+        # Check for completed lines
+        lines = board.clear_lines()
+        if lines > 0:
+            previous_level = mechanics.level
+            score = mechanics.calculate_score(lines, drop_height)
+            events.append({
+                'type': EVENT_LINE_CLEAR,
+                'rows': cleared_rows,
+                'lines': lines,
+                'score': score,
+                'combo': mechanics.combo_count
+            })
+            
+            # Check for level up
+            if mechanics.level > previous_level:
+                events.append({'type': EVENT_LEVEL_UP, 'level': mechanics.level})
+        
+        self._spawn_piece(events)
+    
+    def _spawn_piece(self, events):
+        """Bring in the next piece and check if the game is over"""
+        self.current_piece = self.next_piece
+        self.next_piece = self.piece_queue.next_piece(self.spawn_x, 0)
+        self.last_action_rotated = False
+        events.append({
+            'type': EVENT_SPAWN,
+            'piece': self.current_piece.to_state(),
+            'next_kind': self.next_piece.shape_index
+        })
+        
+        if not self.game_board.is_valid_position(self.current_piece):
+            self.game_over = True
+            events.append({'type': EVENT_GAME_OVER, 'score': self.game_mechanics.score})
@@ -3,6 +3,89 @@ Tetris-like Game for Mac with Apple Silicon
 Enhanced game mechanics module - implements additional game features
 """
 
+import zobrist
+from tetromino import PieceState
+
+# Standard SRS wall kick data
+# Format: (original_rotation, new_rotation): [(x_offset, y_offset), ...]
+_I_WALL_KICKS = {
+    (0, 1): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (1, 0): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (1, 2): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
+    (2, 1): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (2, 3): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
+    (3, 2): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
+    (3, 0): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
+    (0, 3): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)]
+}
+
+_JLSTZ_WALL_KICKS = {
+    (0, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (1, 0): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (1, 2): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
+    (2, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
+    (2, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
+    (3, 2): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (3, 0): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
+    (0, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)]
+}
+
+def _build_wall_kicks():
+    """Compile the kick offsets for every (shape_index, original, new) rotation"""
+    wall_kicks = {}
+    for shape_index in range(7):
+        # O piece doesn't need wall kicks
+        if shape_index == 3:
+            continue
+        
+        # I piece has different wall kick data than other pieces
+        kick_data = _I_WALL_KICKS if shape_index == 0 else _JLSTZ_WALL_KICKS
+        for (original_rotation, new_rotation), offsets in kick_data.items():
+            wall_kicks[(shape_index, original_rotation, new_rotation)] = tuple(offsets)
+    return wall_kicks
+
+# (shape_index, original_rotation, new_rotation) -> kick offsets to try in order
+WALL_KICKS = _build_wall_kicks()
+
+# Base points for lines cleared, multiplied by the level
+LINE_POINTS = {
+    1: 100,   # Single
+    2: 300,   # Double
+    3: 500,   # Triple
+    4: 800    # Tetris
+}
+
+# Bonus points per level
+COMBO_POINTS = 50             # Per combo count
+BACK_TO_BACK_POINTS = 400     # Consecutive Tetris clears
+T_SPIN_POINTS = 400           # Per line cleared with a T-spin
+
+# Lines needed to advance one level
+LINES_PER_LEVEL = 10
+
+# Corners of the T piece's 3x3 box: top-left, top-right, bottom-left, bottom-right
+T_SPIN_CORNERS = ((0, 0), (2, 0), (0, 2), (2, 2))
+
+def is_t_spin(piece, board):
+    """Check the T-spin corner rule for a Tetromino or PieceState on a board"""
+    # Only T pieces can perform T-spins
+    if piece.shape_index != 5:  # T piece
+        return False
+    
+    # Count filled corners around the T piece using the row masks
+    corners_filled = 0
+    rows = board.rows
+    for corner_x, corner_y in T_SPIN_CORNERS:
+        x = piece.x + corner_x
+        y = piece.y + corner_y
+        
+        # Check if corner is outside the board or filled
+        if not (0 <= x < board.width and 0 <= y < board.height) or rows[y] >> x & 1:
+            corners_filled += 1
+    
+    # T-spin requires at least 3 corners filled
+    return corners_filled >= 3
+
 class GameMechanics:
     """Class for enhanced game mechanics"""
     
@@ -17,26 +100,18 @@ class GameMechanics:
     
     def calculate_score(self, lines_cleared, drop_height=0, t_spin=False):
         """Calculate score based on lines cleared and other factors"""
-        # Base points for lines cleared
-        line_points = {
-            1: 100,   # Single
-            2: 300,   # Double
-            3: 500,   # Triple
-            4: 800    # Tetris
-        }
-        
         # No lines cleared
         if lines_cleared == 0:
             # Only award points for hard drop
             return drop_height
         
         # Calculate base score
-        base_score = line_points.get(lines_cleared, 0) * self.level
+        base_score = LINE_POINTS.get(lines_cleared, 0) * self.level
         
         # Apply combo bonus
         if lines_cleared > 0:
             self.combo_count += 1
-            combo_bonus = 50 * self.combo_count * self.level
+            combo_bonus = COMBO_POINTS * self.combo_count * self.level
         else:
             self.combo_count = 0
             combo_bonus = 0
@@ -45,7 +120,7 @@ class GameMechanics:
         b2b_bonus = 0
         if lines_cleared == 4:
             if self.back_to_back_tetris:
-                b2b_bonus = 400 * self.level
+                b2b_bonus = BACK_TO_BACK_POINTS * self.level
             self.back_to_back_tetris = True
         elif lines_cleared > 0:
             self.back_to_back_tetris = False
@@ -53,7 +128,7 @@ class GameMechanics:
         # Apply T-spin bonus
         t_spin_bonus = 0
         if t_spin:
-            t_spin_bonus = 400 * lines_cleared * self.level
+            t_spin_bonus = T_SPIN_POINTS * lines_cleared * self.level
         
         # Calculate total score
         total_score = base_score + combo_bonus + b2b_bonus + t_spin_bonus + drop_height
@@ -65,93 +140,70 @@ class GameMechanics:
         self.lines_cleared += lines_cleared
         
         # Update level (every 10 lines)
-        self.level = (self.lines_cleared // 10) + 1
+        self.level = (self.lines_cleared // LINES_PER_LEVEL) + 1
         
         return total_score
     
+    def apply(self, placement, drop_height=0, t_spin=False):
+        """Lock a piece and score it, returning a token that undoes both"""
+        state = (self.score, self.level, self.lines_cleared,
+                 self.combo_count, self.back_to_back_tetris)
+        board_token = self.game_board.apply(placement)
+        self.calculate_score(board_token['lines_cleared'], drop_height, t_spin)
+        return {'board': board_token, 'state': state}
+    
+    def revert(self, token):
+        """Undo an apply() call, restoring the board and the scoring state"""
+        self.game_board.revert(token['board'])
+        (self.score, self.level, self.lines_cleared,
+         self.combo_count, self.back_to_back_tetris) = token['state']
+    
+    def get_state_hash(self, current_piece, next_piece=None):
+        """Get a 64-bit hash of the board, the pieces, the level and the combo"""
+        state_hash = self.game_board.hash ^ zobrist.piece_key(current_piece)
+        if next_piece is not None:
+            state_hash ^= zobrist.NEXT_PIECE_KEYS[next_piece.shape_index]
+        state_hash ^= zobrist.mix64(zobrist.LEVEL_SALT ^ self.level)
+        state_hash ^= zobrist.mix64(zobrist.COMBO_SALT ^ self.combo_count)
+        return state_hash
+    
     def get_ghost_piece_position(self, tetromino):
         """Get the position of the ghost piece (preview of where piece will land)"""
-        # Create a copy of the current tetromino
-        ghost_y = tetromino.y
+        # Resolve the landing row from the board's column heights
+        return tetromino.y + self.game_board.get_drop_distance(tetromino)
+    
+    def get_wall_kick_offset(self, piece, rotation_direction):
+        """Get the first wall kick (dx, dy) that fits a just rotated piece, or None"""
+        # O piece doesn't need wall kicks
+        if piece.shape_index == 3:  # O piece
+            return None
         
-        # Move the ghost piece down until it hits something
-        while self.game_board.is_valid_position(tetromino, dy=ghost_y - tetromino.y + 1):
-            ghost_y += 1
+        # The piece has already been rotated, so work out where it came from
+        new_rotation = piece.rotation
+        original_rotation = (new_rotation - (1 if rotation_direction else -1)) % 4
         
-        return ghost_y
+        # Try each wall kick offset
+        kick_data = WALL_KICKS[(piece.shape_index, original_rotation, new_rotation)]
+        return self.game_board.find_valid_offset(piece, kick_data)
     
     def perform_wall_kick(self, tetromino, rotation_direction):
-        """Attempt to perform wall kick when rotation would cause collision"""
-        # Standard SRS wall kick data
-        # Format: (test_index, (original_rotation, new_rotation)): [(x_offset, y_offset), ...]
+        """Attempt to perform wall kick after a rotation caused a collision
         
-        # I piece has different wall kick data than other pieces
-        if tetromino.shape_index == 0:  # I piece
-            wall_kick_data = {
-                (0, 1): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
-                (1, 0): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
-                (1, 2): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)],
-                (2, 1): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
-                (2, 3): [(0, 0), (2, 0), (-1, 0), (2, 1), (-1, -2)],
-                (3, 2): [(0, 0), (-2, 0), (1, 0), (-2, -1), (1, 2)],
-                (3, 0): [(0, 0), (1, 0), (-2, 0), (1, -2), (-2, 1)],
-                (0, 3): [(0, 0), (-1, 0), (2, 0), (-1, 2), (2, -1)]
-            }
-        else:  # JLSTZ pieces
-            wall_kick_data = {
-                (0, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
-                (1, 0): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
-                (1, 2): [(0, 0), (1, 0), (1, -1), (0, 2), (1, 2)],
-                (2, 1): [(0, 0), (-1, 0), (-1, 1), (0, -2), (-1, -2)],
-                (2, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)],
-                (3, 2): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
-                (3, 0): [(0, 0), (-1, 0), (-1, -1), (0, 2), (-1, 2)],
-                (0, 3): [(0, 0), (1, 0), (1, 1), (0, -2), (1, -2)]
-            }
-        
-        # O piece doesn't need wall kicks
-        if tetromino.shape_index == 3:  # O piece
+        A Tetromino is moved in place and True returned; a PieceState can't be
+        moved, so the kicked PieceState is returned instead. False if no kick fits.
+        """
+        offset = self.get_wall_kick_offset(tetromino, rotation_direction)
+        if offset is None:
             return False
         
-        # Calculate original and new rotation states
-        original_rotation = tetromino.rotation
-        new_rotation = (original_rotation + (1 if rotation_direction else -1)) % 4
+        if isinstance(tetromino, PieceState):
+            return tetromino.moved(*offset)
         
-        # Get wall kick data for this rotation
-        kick_data = wall_kick_data.get((original_rotation, new_rotation), [])
-        
-        # Try each wall kick offset
-        for offset_x, offset_y in kick_data:
-            if self.game_board.is_valid_position(tetromino, dx=offset_x, dy=offset_y):
-                # Apply the offset
-                tetromino.x += offset_x
-                tetromino.y += offset_y
-                return True
-        
-        # If no wall kick worked, return False
-        return False
+        # Apply the offset
+        tetromino.x += offset[0]
+        tetromino.y += offset[1]
+        return True
     
     def is_t_spin(self, tetromino, board):
         """Check if the last move was a T-spin"""
-        # Only T pieces can perform T-spins
-        if tetromino.shape_index != 5:  # T piece
-            return False
-        
-        # Count filled corners around the T piece
-        corners_filled = 0
-        corners = [
-            (tetromino.x, tetromino.y),  # Top-left
-            (tetromino.x + 2, tetromino.y),  # Top-right
-            (tetromino.x, tetromino.y + 2),  # Bottom-left
-            (tetromino.x + 2, tetromino.y + 2)  # Bottom-right
-        ]
-        
-        for x, y in corners:
-            # Check if corner is outside the board or filled
-            if (x < 0 or x >= board.width or 
-                y < 0 or y >= board.height or 
-                (0 <= y < board.height and 0 <= x < board.width and board.board[y][x])):
-                corners_filled += 1
-        
-        # T-spin requires at least 3 corners filled
-        return corners_filled >= 3
+        return is_t_spin(tetromino, board)
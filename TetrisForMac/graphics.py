@@ -154,20 +154,18 @@ class Graphics:
     
     def draw_ghost_piece(self, surface, tetromino, ghost_y, board_x, board_y):
         """Draw ghost piece (preview of where piece will land)"""
-        for y, row in enumerate(tetromino.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    # Calculate position
-                    pos_x = board_x + (tetromino.x + x) * self.block_size
-                    pos_y = board_y + (ghost_y + y) * self.block_size
-                    
-                    # Draw ghost block (semi-transparent outline)
-                    pygame.draw.rect(
-                        surface,
-                        (*tetromino.color[:3], 100),  # Semi-transparent
-                        (pos_x, pos_y, self.block_size, self.block_size),
-                        2  # Outline only
-                    )
+        for x, y in tetromino.cells:
+            # Calculate position
+            pos_x = board_x + (tetromino.x + x) * self.block_size
+            pos_y = board_y + (ghost_y + y) * self.block_size
+            
+            # Draw ghost block (semi-transparent outline)
+            pygame.draw.rect(
+                surface,
+                (*tetromino.color[:3], 100),  # Semi-transparent
+                (pos_x, pos_y, self.block_size, self.block_size),
+                2  # Outline only
+            )
     
     def add_particles(self, x, y, color, count=10):
         """Add particles at the specified position"""
@@ -182,9 +180,22 @@ class Graphics:
                 'life': random.uniform(20, 40)
             })
     
+    def add_particle_bursts(self, bursts, count=10):
+        """Add particles for a batch of (x, y, color) positions at once"""
+        uniform = random.uniform
+        self.particles.extend({
+            'x': x,
+            'y': y,
+            'dx': uniform(-2, 2),
+            'dy': uniform(-3, 0),
+            'size': uniform(2, 5),
+            'color': color,
+            'life': uniform(20, 40)
+        } for x, y, color in bursts for _ in range(count))
+    
     def update_particles(self):
         """Update particle positions and remove dead particles"""
-        for particle in self.particles[:]:
+        for particle in self.particles:
             # Update position
             particle['x'] += particle['dx']
             particle['y'] += particle['dy']
@@ -194,10 +205,9 @@ class Graphics:
             
             # Decrease life
             particle['life'] -= 1
-            
-            # Remove dead particles
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
+        
+        # Remove dead particles in one pass
+        self.particles = [particle for particle in self.particles if particle['life'] > 0]
     
     def draw_particles(self, surface):
         """Draw all particles"""
@@ -230,6 +240,17 @@ class Graphics:
             'max_progress': 15
         })
     
+    def add_line_clear_animations(self, rows, board_x, board_y, width):
+        """Add line clear animations for a batch of rows at once"""
+        self.line_clear_animations.extend({
+            'y': y,
+            'board_x': board_x,
+            'board_y': board_y,
+            'width': width,
+            'progress': 0,
+            'max_progress': 15
+        } for y in rows)
+    
     def update_line_clear_animations(self):
         """Update line clear animations"""
         for anim in self.line_clear_animations[:]:
@@ -24,6 +24,9 @@ class InputHandler:
         self.pressed_keys = {}
         self.key_hold_time = {}
         self.last_repeat_time = {}
+        
+        # Optional ReplayRecorder that logs the input flags of every frame
+        self.recorder = None
     
     def _detect_apple_silicon(self):
         """Detect if running on Apple Silicon"""
@@ -51,7 +54,8 @@ class InputHandler:
             'pause': False,
             'mute': False,
             'restart': False,
-            'change_style': False
+            'change_style': False,
+            'autoplay': False
         }
         
         for event in events:
@@ -83,6 +87,8 @@ class InputHandler:
                     result['restart'] = True
                 elif event.key == pygame.K_b:
                     result['change_style'] = True
+                elif event.key == pygame.K_a:
+                    result['autoplay'] = True
             
             elif event.type == pygame.KEYUP:
                 # Clear key state
@@ -112,6 +118,9 @@ class InputHandler:
                         elif key == pygame.K_DOWN:
                             result['move_down'] = True
         
+        if self.recorder is not None:
+            self.recorder.record_input(result)
+        
         return result
     
     def get_touch_input(self):
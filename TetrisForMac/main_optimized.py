@@ -8,17 +8,21 @@ import pygame
 import sys
 import random
 import os
-from tetromino import Tetromino
-from game_board import GameBoard
+import time
+from game_engine import GameEngine, PLAYER_ACTIONS, TICK_RATE, EVENT_SPAWN
 from colors import COLORS
 from sound_effects import SoundEffects
-from game_mechanics import GameMechanics
 from ui import UI
 from graphics import Graphics
 from apple_silicon_optimizer import AppleSiliconOptimizer
 from metal_renderer import MetalRenderer
 from memory_optimizer import MemoryOptimizer
 from input_handler import InputHandler
+from autoplay_bot import AutoplayBot
+from contour_cache import ContourCache
+from replay_recorder import ReplayRecorder, default_replay_dir
+from fixed_timestep import FixedTimestep, interpolate
+from effect_dispatcher import EffectDispatcher, EVENT_SOUNDS
 
 # Initialize pygame
 pygame.init()
@@ -31,6 +35,7 @@ BOARD_WIDTH = 10
 BOARD_HEIGHT = 20
 BOARD_POSITION_X = (SCREEN_WIDTH - BOARD_WIDTH * BLOCK_SIZE) // 2
 BOARD_POSITION_Y = 50
+REPLAY_DIR = default_replay_dir()
 
 # Initialize Apple Silicon optimizations
 apple_silicon_optimizer = AppleSiliconOptimizer()
@@ -54,40 +59,59 @@ metal_renderer = MetalRenderer(SCREEN_WIDTH, SCREEN_HEIGHT, BLOCK_SIZE)
 input_handler = InputHandler()
 input_handler.setup()
 
-# Clock for controlling the frame rate
+# Clock for controlling the frame rate; the simulation runs at TICK_RATE whatever it is
 clock = pygame.time.Clock()
 FPS = 60
 
+# Most simulation ticks a slow frame may catch up on
+MAX_TICKS_PER_FRAME = 5
+
+# Slide the falling piece between cells, for displays faster than the tick rate
+SMOOTH_MOVEMENT = False
+
 def main():
     """Main game function"""
     global screen
     
     # Create game components
-    game_board = GameBoard(BOARD_WIDTH, BOARD_HEIGHT)
+    engine = GameEngine(BOARD_WIDTH, BOARD_HEIGHT)
     sound_effects = SoundEffects()
-    game_mechanics = GameMechanics(game_board)
     ui = UI(SCREEN_WIDTH, SCREEN_HEIGHT, BLOCK_SIZE)
     graphics = Graphics(BLOCK_SIZE)
-    
-    # Game state variables
-    current_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
-    next_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
+    bot = AutoplayBot(contour_cache=ContourCache(BOARD_WIDTH))
     ghost_y = 0
     
-    # Game timing
-    fall_time = 0
-    fall_speed = 0.5  # seconds
-    last_fall_time = pygame.time.get_ticks()
+    # Game timing: player actions wait for the next tick, which also drives gravity
+    timestep = FixedTimestep(TICK_RATE, MAX_TICKS_PER_FRAME)
+    pending_actions = []
+    previous_piece = None
     
     # Game flags
-    game_over = False
     paused = False
     muted = False
-    last_level = 1
+    autoplay = False
     
     # Frame counter for memory optimization
     frame_count = 0
     
+    # Sounds and animations of a frame's events are applied together once per frame
+    effects = EffectDispatcher(graphics, sound_effects, BOARD_POSITION_X, BOARD_POSITION_Y,
+                               BOARD_WIDTH, BLOCK_SIZE)
+    engine.subscribe(effects.queue, list(EVENT_SOUNDS))
+    
+    # Record the session so reported bugs and lag can be replayed
+    replay_path = os.path.join(REPLAY_DIR, time.strftime("session-%Y%m%d-%H%M%S.trpl"))
+    try:
+        recorder = ReplayRecorder(replay_path, BOARD_WIDTH, BOARD_HEIGHT, engine.seed)
+    except OSError as e:
+        # Play on without recording if the replay directory isn't writable
+        print(f"Replay recording disabled: {e}")
+        recorder = None
+    if recorder is not None:
+        engine.recorder = recorder
+        input_handler.recorder = recorder
+        engine.subscribe(lambda event: recorder.record_spawn(event['piece'].kind), [EVENT_SPAWN])
+    
     # Print system info
     system_info = apple_silicon_optimizer.get_system_info()
     print(f"Running on: {system_info['system']} {system_info['release']}")
@@ -95,354 +119,225 @@ def main():
     print(f"Apple Silicon: {system_info['is_apple_silicon']}")
     print(f"Optimization level: {system_info['optimization_level']}")
     print(f"Metal rendering: {metal_renderer.is_enabled}")
+    print(f"Piece seed: {engine.seed}")
     
     # Main game loop
     running = True
-    while running:
-        # Increment frame counter
-        frame_count += 1
-        
-        # Run memory optimizations
-        memory_optimizer.optimize_for_frame(frame_count)
-        
-        # Calculate time since last piece movement
-        current_time = pygame.time.get_ticks()
-        delta_time = (current_time - last_fall_time) / 1000.0
-        
-        # Get all events
-        events = pygame.event.get()
-        
-        # Process input with optimized handler
-        input_actions = input_handler.process_events(events)
-        
-        # Check for quit
-        if input_actions['quit']:
-            running = False
-        
-        # Handle game actions
-        if not game_over and not paused:
-            if input_actions['move_left']:
-                if game_board.is_valid_position(current_piece, dx=-1):
-                    current_piece.x -= 1
-                    sound_effects.play('move')
+    try:
+        while running:
+            # Increment frame counter
+            frame_count += 1
             
-            if input_actions['move_right']:
-                if game_board.is_valid_position(current_piece, dx=1):
-                    current_piece.x += 1
-                    sound_effects.play('move')
+            # Run memory optimizations
+            memory_optimizer.optimize_for_frame(frame_count)
             
-            if input_actions['move_down']:
-                if game_board.is_valid_position(current_piece, dy=1):
-                    current_piece.y += 1
-                    sound_effects.play('move')
-                else:
-                    # Lock the piece in place if it can't move down
-                    game_board.lock_piece(current_piece)
-                    sound_effects.play('drop')
-                    
-                    # Add particles at the landing position
-                    for y, row in enumerate(current_piece.shape):
-                        for x, cell in enumerate(row):
-                            if cell:
-                                pos_x = BOARD_POSITION_X + (current_piece.x + x) * BLOCK_SIZE + BLOCK_SIZE // 2
-                                pos_y = BOARD_POSITION_Y + (current_piece.y + y) * BLOCK_SIZE + BLOCK_SIZE // 2
-                                graphics.add_particles(pos_x, pos_y, current_piece.color)
-                    
-                    # Check for completed lines
-                    lines = game_board.clear_lines()
-                    if lines > 0:
-                        # Add line clear animations
-                        for y in range(BOARD_HEIGHT - 1, -1, -1):
-                            if all(game_board.board[y]):
-                                graphics.add_line_clear_animation(
-                                    y, BOARD_POSITION_X, BOARD_POSITION_Y, BOARD_WIDTH
-                                )
-                        
-                        # Play sound effect
-                        sound_effects.play('clear_line')
-                        
-                        # Update score and level
-                        drop_height = current_piece.y
-                        game_mechanics.calculate_score(lines, drop_height)
-                        
-                        # Check for level up
-                        if game_mechanics.level > last_level:
-                            sound_effects.play('level_up')
-                            graphics.start_level_up_animation(game_mechanics.level)
-                            last_level = game_mechanics.level
-                            fall_speed = max(0.05, 0.5 - (game_mechanics.level - 1) * 0.05)
-                    
-                    # Get next piece
-                    current_piece = next_piece
-                    next_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
-                    
-                    # Check if game is over
-                    if not game_board.is_valid_position(current_piece):
-                        game_over = True
-                        sound_effects.play('game_over')
+            # Get all events
+            events = pygame.event.get()
             
-            if input_actions['rotate']:
-                # Save original rotation
-                original_rotation = current_piece.rotation
-                
-                # Rotate the piece
-                current_piece.rotate()
-                
-                # Check if rotation is valid, if not try wall kick
-                if not game_board.is_valid_position(current_piece):
-                    # Try wall kick
-                    if game_mechanics.perform_wall_kick(current_piece, True):
-                        sound_effects.play('rotate')
-                    else:
-                        # Rotate back if wall kick failed
-                        current_piece.rotate(clockwise=False)
-                else:
-                    sound_effects.play('rotate')
+            # Process input with optimized handler
+            input_actions = input_handler.process_events(events)
             
-            if input_actions['hard_drop']:
-                # Hard drop
-                drop_height = 0
-                while game_board.is_valid_position(current_piece, dy=1):
-                    current_piece.y += 1
-                    drop_height += 1
-                
-                # Lock the piece and get a new one
-                game_board.lock_piece(current_piece)
-                sound_effects.play('drop')
-                
-                # Add particles at the landing position
-                for y, row in enumerate(current_piece.shape):
-                    for x, cell in enumerate(row):
-                        if cell:
-                            pos_x = BOARD_POSITION_X + (current_piece.x + x) * BLOCK_SIZE + BLOCK_SIZE // 2
-                            pos_y = BOARD_POSITION_Y + (current_piece.y + y) * BLOCK_SIZE + BLOCK_SIZE // 2
-                            graphics.add_particles(pos_x, pos_y, current_piece.color)
-                
-                # Check for completed lines
-                lines = game_board.clear_lines()
-                if lines > 0:
-                    # Add line clear animations
-                    for y in range(BOARD_HEIGHT - 1, -1, -1):
-                        if all(game_board.board[y]):
-                            graphics.add_line_clear_animation(
-                                y, BOARD_POSITION_X, BOARD_POSITION_Y, BOARD_WIDTH
-                            )
-                    
-                    # Play sound effect
-                    sound_effects.play('clear_line')
-                    
-                    # Update score with hard drop bonus
-                    game_mechanics.calculate_score(lines, drop_height)
-                    
-                    # Check for level up
-                    if game_mechanics.level > last_level:
-                        sound_effects.play('level_up')
-                        graphics.start_level_up_animation(game_mechanics.level)
-                        last_level = game_mechanics.level
-                        fall_speed = max(0.05, 0.5 - (game_mechanics.level - 1) * 0.05)
-                
-                current_piece = next_piece
-                next_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
+            # Check for quit
+            if input_actions['quit']:
+                running = False
+            
+            # Handle game actions
+            if not engine.game_over and not paused:
+                if not autoplay:
+                    pending_actions.extend(action for action in PLAYER_ACTIONS if input_actions[action])
                 
-                if not game_board.is_valid_position(current_piece):
-                    game_over = True
-                    sound_effects.play('game_over')
+                if input_actions['change_style']:
+                    # Change block style
+                    new_style = graphics.change_block_style()
+                    print(f"Block style changed to: {new_style}")
             
-            if input_actions['change_style']:
-                # Change block style
-                new_style = graphics.change_block_style()
-                print(f"Block style changed to: {new_style}")
-        
-        # Global controls (work even when paused or game over)
-        if input_actions['pause']:
-            # Toggle pause
-            paused = not paused
-        
-        if input_actions['mute']:
-            # Toggle mute
-            muted = not muted
-            sound_effects.set_volume(0.0 if muted else 1.0)
-        
-        if input_actions['restart'] and game_over:
-            # Reset game
-            game_board = GameBoard(BOARD_WIDTH, BOARD_HEIGHT)
-            game_mechanics = GameMechanics(game_board)
-            current_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
-            next_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
-            game_over = False
-            last_level = 1
-            fall_speed = 0.5
-        
-        # Update game state if not paused or game over
-        if not paused and not game_over:
-            # Update ghost piece position
-            ghost_y = game_mechanics.get_ghost_piece_position(current_piece)
+            # Global controls (work even when paused or game over)
+            if input_actions['pause']:
+                # Toggle pause
+                paused = not paused
             
-            # Move piece down automatically after fall_speed seconds
-            fall_time += delta_time
-            if fall_time >= fall_speed:
-                if game_board.is_valid_position(current_piece, dy=1):
-                    current_piece.y += 1
-                else:
-                    # Lock the piece in place if it can't move down
-                    game_board.lock_piece(current_piece)
-                    sound_effects.play('drop')
+            if input_actions['mute']:
+                # Toggle mute
+                muted = not muted
+                sound_effects.set_volume(0.0 if muted else 1.0)
+            
+            if input_actions['autoplay']:
+                # Toggle attract mode
+                autoplay = not autoplay
+                bot.reset()
+            
+            if (input_actions['restart'] or autoplay) and engine.game_over:
+                # Reset game, restarting by itself in attract mode
+                engine.reset()
+                bot.reset()
+                if recorder is not None:
+                    recorder.record_reset(engine.seed)
+                print(f"Piece seed: {engine.seed}")
+            
+            # Run the simulation ticks that fit in the time since the last frame
+            if not paused and not engine.game_over:
+                if autoplay:
+                    # The bot thinks within a slice of the frame, however many ticks it runs
+                    bot.think(engine)
+                
+                for _ in range(timestep.advance(time.perf_counter_ns())):
+                    previous_piece = (engine.pieces_locked, engine.current_piece.to_state())
                     
-                    # Add particles at the landing position
-                    for y, row in enumerate(current_piece.shape):
-                        for x, cell in enumerate(row):
-                            if cell:
-                                pos_x = BOARD_POSITION_X + (current_piece.x + x) * BLOCK_SIZE + BLOCK_SIZE // 2
-                                pos_y = BOARD_POSITION_Y + (current_piece.y + y) * BLOCK_SIZE + BLOCK_SIZE // 2
-                                graphics.add_particles(pos_x, pos_y, current_piece.color)
+                    if autoplay:
+                        # Follow the path the bot planned, without searching again
+                        bot.act(engine)
+                    else:
+                        for action in pending_actions:
+                            engine.step(action)
+                        pending_actions.clear()
                     
-                    # Check for completed lines
-                    lines = game_board.clear_lines()
-                    if lines > 0:
-                        # Add line clear animations
-                        for y in range(BOARD_HEIGHT - 1, -1, -1):
-                            if all(game_board.board[y]):
-                                graphics.add_line_clear_animation(
-                                    y, BOARD_POSITION_X, BOARD_POSITION_Y, BOARD_WIDTH
-                                )
-                        
-                        # Play sound effect
-                        sound_effects.play('clear_line')
-                        
-                        # Update score
-                        game_mechanics.calculate_score(lines)
-                        
-                        # Check for level up
-                        if game_mechanics.level > last_level:
-                            sound_effects.play('level_up')
-                            graphics.start_level_up_animation(game_mechanics.level)
-                            last_level = game_mechanics.level
-                            fall_speed = max(0.05, 0.5 - (game_mechanics.level - 1) * 0.05)
+                    # Move piece down automatically every gravity_ticks ticks
+                    engine.tick()
                     
-                    # Get next piece
-                    current_piece = next_piece
-                    next_piece = Tetromino(BOARD_WIDTH // 2 - 1, 0)
+                    # Update animations
+                    graphics.update_particles()
+                    graphics.update_line_clear_animations()
+                    graphics.update_level_up_animation()
+                    graphics.update_stars()
                     
-                    # Check if game is over
-                    if not game_board.is_valid_position(current_piece):
-                        game_over = True
-                        sound_effects.play('game_over')
+                    if engine.game_over:
+                        break
                 
-                fall_time = 0
+                # Update ghost piece position
+                ghost_y = engine.get_ghost_y()
+            else:
+                # Don't catch up on the time spent paused or on the game over screen
+                timestep.reset(time.perf_counter_ns())
+                pending_actions.clear()
+            
+            # Play the sounds and start the animations of this frame's events
+            effects.flush()
             
-            last_fall_time = current_time
+            # Start Metal frame if available
+            using_metal = metal_renderer.begin_frame()
             
-            # Update animations
-            graphics.update_particles()
-            graphics.update_line_clear_animations()
-            graphics.update_level_up_animation()
-            graphics.update_stars()
-        
-        # Start Metal frame if available
-        using_metal = metal_renderer.begin_frame()
-        
-        # Draw everything
-        # Draw background
-        screen.fill(COLORS['BLACK'])
-        graphics.draw_stars(screen)
-        
-        # Draw game board background
-        pygame.draw.rect(
-            screen, 
-            COLORS['DARK_GRAY'], 
-            (BOARD_POSITION_X - 2, BOARD_POSITION_Y - 2, 
-             BOARD_WIDTH * BLOCK_SIZE + 4, BOARD_HEIGHT * BLOCK_SIZE + 4)
-        )
-        pygame.draw.rect(
-            screen, 
-            COLORS['GRAY'], 
-            (BOARD_POSITION_X - 2, BOARD_POSITION_Y - 2, 
-             BOARD_WIDTH * BLOCK_SIZE + 4, BOARD_HEIGHT * BLOCK_SIZE + 4),
-            2
-        )
-        
-        # Draw board grid and locked pieces
-        for y in range(BOARD_HEIGHT):
-            for x in range(BOARD_WIDTH):
-                # Draw grid
-                pygame.draw.rect(
-                    screen,
-                    (30, 30, 30),
-                    (BOARD_POSITION_X + x * BLOCK_SIZE, 
-                     BOARD_POSITION_Y + y * BLOCK_SIZE,
-                     BLOCK_SIZE, BLOCK_SIZE),
-                    1
+            # Draw everything
+            # Draw background
+            screen.fill(COLORS['BLACK'])
+            graphics.draw_stars(screen)
+            
+            # Draw game board background
+            pygame.draw.rect(
+                screen, 
+                COLORS['DARK_GRAY'], 
+                (BOARD_POSITION_X - 2, BOARD_POSITION_Y - 2, 
+                 BOARD_WIDTH * BLOCK_SIZE + 4, BOARD_HEIGHT * BLOCK_SIZE + 4)
+            )
+            pygame.draw.rect(
+                screen, 
+                COLORS['GRAY'], 
+                (BOARD_POSITION_X - 2, BOARD_POSITION_Y - 2, 
+                 BOARD_WIDTH * BLOCK_SIZE + 4, BOARD_HEIGHT * BLOCK_SIZE + 4),
+                2
+            )
+            
+            # Draw board grid and locked pieces
+            for y in range(BOARD_HEIGHT):
+                for x in range(BOARD_WIDTH):
+                    # Draw grid
+                    pygame.draw.rect(
+                        screen,
+                        (30, 30, 30),
+                        (BOARD_POSITION_X + x * BLOCK_SIZE, 
+                         BOARD_POSITION_Y + y * BLOCK_SIZE,
+                         BLOCK_SIZE, BLOCK_SIZE),
+                        1
+                    )
+                    
+                    # Draw locked pieces
+                    color = engine.game_board.get_cell_color(x, y)
+                    if color:
+                        graphics.draw_block(
+                            screen,
+                            BOARD_POSITION_X + x * BLOCK_SIZE,
+                            BOARD_POSITION_Y + y * BLOCK_SIZE,
+                            color
+                        )
+            
+            # Draw ghost piece
+            if not engine.game_over and not paused:
+                graphics.draw_ghost_piece(
+                    screen, engine.current_piece, ghost_y, 
+                    BOARD_POSITION_X, BOARD_POSITION_Y
                 )
+            
+            # Draw current piece
+            if engine.current_piece and not engine.game_over:
+                piece_x = engine.current_piece.x
+                piece_y = engine.current_piece.y
+                
+                # Interpolation hook: draw between the last two ticks if the piece only moved
+                if SMOOTH_MOVEMENT and previous_piece is not None:
+                    pieces_locked, previous = previous_piece
+                    if (pieces_locked == engine.pieces_locked and
+                            previous.rotation == engine.current_piece.rotation):
+                        piece_x = interpolate(previous.x, piece_x, timestep.alpha)
+                        piece_y = interpolate(previous.y, piece_y, timestep.alpha)
                 
-                # Draw locked pieces
-                if game_board.board[y][x]:
+                for x, y in engine.current_piece.cells:
                     graphics.draw_block(
                         screen,
-                        BOARD_POSITION_X + x * BLOCK_SIZE,
-                        BOARD_POSITION_Y + y * BLOCK_SIZE,
-                        game_board.board[y][x]
+                        BOARD_POSITION_X + int((piece_x + x) * BLOCK_SIZE),
+                        BOARD_POSITION_Y + int((piece_y + y) * BLOCK_SIZE),
+                        engine.current_piece.color
                     )
-        
-        # Draw ghost piece
-        if not game_over and not paused:
-            graphics.draw_ghost_piece(
-                screen, current_piece, ghost_y, 
-                BOARD_POSITION_X, BOARD_POSITION_Y
+            
+            # Draw UI elements
+            ui.draw_game_info(
+                screen, 
+                engine.game_mechanics.score, 
+                engine.game_mechanics.level, 
+                engine.game_mechanics.lines_cleared,
+                engine.next_piece,
+                50, 100, 200
             )
-        
-        # Draw current piece
-        if current_piece and not game_over:
-            for y, row in enumerate(current_piece.shape):
-                for x, cell in enumerate(row):
-                    if cell:
-                        graphics.draw_block(
-                            screen,
-                            BOARD_POSITION_X + (current_piece.x + x) * BLOCK_SIZE,
-                            BOARD_POSITION_Y + (current_piece.y + y) * BLOCK_SIZE,
-                            current_piece.color
-                        )
-        
-        # Draw UI elements
-        ui.draw_game_info(
-            screen, 
-            game_mechanics.score, 
-            game_mechanics.level, 
-            game_mechanics.lines_cleared,
-            next_piece,
-            50, 100, 200
-        )
-        
-        ui.draw_controls(screen, 50, 450, 200)
-        
-        # Draw logo at the top
-        screen.blit(ui.logo, (SCREEN_WIDTH // 2 - ui.logo.get_width() // 2, 10))
-        
-        # Draw animations
-        graphics.draw_particles(screen)
-        graphics.draw_line_clear_animations(screen)
-        graphics.draw_level_up_animation(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
-        
-        # Draw game over or pause overlay
-        if game_over:
-            ui.draw_game_over(screen, game_mechanics.score)
-        elif paused:
-            ui.draw_pause(screen)
-        
-        # Draw mute indicator
-        if muted:
-            ui.draw_text(screen, "MUTED", ui.small_font, COLORS['RED'], 
-                        SCREEN_WIDTH - 80, 10)
-        
-        # Apply Metal post-processing if available
-        if using_metal:
-            screen = metal_renderer.apply_post_processing(screen)
-            metal_renderer.end_frame()
-        
-        # Update the display
-        pygame.display.flip()
-        
-        # Cap the frame rate
-        clock.tick(FPS)
+            
+            ui.draw_controls(screen, 50, 450, 200)
+            
+            # Draw logo at the top
+            screen.blit(ui.logo, (SCREEN_WIDTH // 2 - ui.logo.get_width() // 2, 10))
+            
+            # Draw animations
+            graphics.draw_particles(screen)
+            graphics.draw_line_clear_animations(screen)
+            graphics.draw_level_up_animation(screen, SCREEN_WIDTH, SCREEN_HEIGHT)
+            
+            # Draw game over or pause overlay
+            if engine.game_over:
+                ui.draw_game_over(screen, engine.game_mechanics.score)
+            elif paused:
+                ui.draw_pause(screen)
+            
+            # Draw mute indicator
+            if muted:
+                ui.draw_text(screen, "MUTED", ui.small_font, COLORS['RED'], 
+                            SCREEN_WIDTH - 80, 10)
+            
+            # Draw autoplay indicator
+            if autoplay:
+                ui.draw_text(screen, "AUTOPLAY", ui.small_font, COLORS['GREEN'], 
+                            SCREEN_WIDTH - 100, 30)
+            
+            # Apply Metal post-processing if available
+            if using_metal:
+                screen = metal_renderer.apply_post_processing(screen)
+                metal_renderer.end_frame()
+            
+            # Update the display
+            pygame.display.flip()
+            
+            # Cap the frame rate
+            clock.tick(FPS)
+    finally:
+        # Flush the replay even if the game crashed, as the last moments matter most
+        if recorder is not None:
+            recorder.close()
+            print(f"Replay saved to: {replay_path}")
     
     # Clean up
     if metal_renderer.is_enabled:
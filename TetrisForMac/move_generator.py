@@ -0,0 +1,98 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Move generator module - lists every placement a piece can reach on a board
+"""
+
+from collections import deque, namedtuple
+from tetromino import PieceState, PIECE_BOUNDS, PIECE_ROW_MASKS
+from game_mechanics import WALL_KICKS, is_t_spin
+from game_engine import ACTION_MOVE_LEFT, ACTION_MOVE_RIGHT, ACTION_MOVE_DOWN, ACTION_ROTATE, ACTION_HARD_DROP
+
+# A final resting placement, the engine actions that reach it from the start, and
+# whether it was reached by rotating into place as a T-spin
+Placement = namedtuple('Placement', ['piece', 'path', 't_spin'])
+
+# Rows kept between the piece and the ceiling or the stack before searching every row,
+# enough to cover the two-row vertical reach of the SRS kicks
+_KICK_MARGIN = 3
+
+def placement_key(piece):
+    """Get the cells a placement would fill as a hashable key"""
+    left, top, _, _ = PIECE_BOUNDS[piece.kind][piece.rotation]
+    shift = piece.x + left
+    return (piece.y + top, tuple(mask << shift for mask in PIECE_ROW_MASKS[piece.kind][piece.rotation]))
+
+def generate_placements(game_board, piece, include_paths=True):
+    """List every distinct resting placement reachable with moves, rotations and drops"""
+    start = PieceState(piece.shape_index, piece.rotation, piece.x, piece.y)
+    if not game_board.is_valid_position(start):
+        return []
+    
+    # Rows above this one are empty, so searching them row by row finds nothing new
+    bottom = max(PIECE_BOUNDS[start.kind][r][3] for r in range(4))
+    free_y = game_board.height - max(game_board.column_heights) - bottom - _KICK_MARGIN
+    
+    parents = {start: None}
+    queue = deque([start])
+    placements = {}
+    
+    while queue:
+        state = queue.popleft()
+        
+        # Hard dropping from here gives a placement
+        landing = state.moved(dy=game_board.get_drop_distance(state))
+        spin = landing == state and parents[state] is not None and parents[state][1] == (ACTION_ROTATE,)
+        t_spin = spin and is_t_spin(landing, game_board)
+        key = (placement_key(landing), t_spin)
+        if key not in placements:
+            placements[key] = (landing, state, t_spin)
+        
+        # Sideways moves
+        for dx, action in ((-1, ACTION_MOVE_LEFT), (1, ACTION_MOVE_RIGHT)):
+            moved = state.moved(dx=dx)
+            if moved not in parents and game_board.is_valid_position(moved):
+                parents[moved] = (state, (action,))
+                queue.append(moved)
+        
+        # Clockwise rotation with wall kicks, as the engine does it
+        rotated = state.rotated()
+        if rotated.rotation != state.rotation:
+            offset = game_board.find_valid_offset(
+                rotated, WALL_KICKS[(state.kind, state.rotation, rotated.rotation)])
+            if offset is not None:
+                rotated = rotated.moved(*offset)
+                if rotated not in parents:
+                    parents[rotated] = (state, (ACTION_ROTATE,))
+                    queue.append(rotated)
+        
+        # Soft drop, skipping straight down through the empty rows
+        if game_board.is_valid_position(state, dy=1):
+            if _KICK_MARGIN <= state.y + 1 < free_y:
+                distance = min(free_y - state.y, game_board.get_drop_distance(state))
+            else:
+                distance = 1
+            dropped = state.moved(dy=distance)
+            if dropped not in parents:
+                parents[dropped] = (state, (ACTION_MOVE_DOWN,) * distance)
+                queue.append(dropped)
+    
+    result = []
+    for landing, state, t_spin in placements.values():
+        path = None
+        if include_paths:
+            path = _path_to(parents, state)
+            path.append(ACTION_HARD_DROP)
+        result.append(Placement(landing, path, t_spin))
+    return result
+
+def _path_to(parents, state):
+    """Rebuild the list of actions leading to a searched state"""
+    steps = []
+    while parents[state] is not None:
+        state, actions = parents[state]
+        steps.append(actions)
+    
+    path = []
+    for actions in reversed(steps):
+        path.extend(actions)
+    return path
@@ -0,0 +1,64 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Piece queue module - provides a seeded 7-bag piece randomizer with lookahead
+"""
+
+import random
+from collections import deque
+from itertools import islice
+from tetromino import SHAPES, Tetromino
+
+class PieceQueue:
+    """Class generating a reproducible sequence of pieces using the 7-bag rule"""
+    
+    def __init__(self, seed=None, bags_per_chunk=16):
+        """Initialize the queue, picking a random seed if none is given"""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.bags_per_chunk = bags_per_chunk
+        self.pieces_dealt = 0
+        
+        # Own generator so the sequence depends only on the seed
+        self._rng = random.Random(seed)
+        self._queue = deque()
+        
+        # Generator state shared by the snapshots taken between two fills
+        self._rng_state = None
+    
+    def _fill(self):
+        """Append a chunk of shuffled bags to the queue"""
+        bag = list(range(len(SHAPES)))
+        for _ in range(self.bags_per_chunk):
+            self._rng.shuffle(bag)
+            self._queue.extend(bag)
+        self._rng_state = None
+    
+    def get_state(self):
+        """Get a snapshot of the queue that set_state() can return to"""
+        if self._rng_state is None:
+            self._rng_state = self._rng.getstate()
+        return (self.pieces_dealt, self._rng_state, bytes(self._queue))
+    
+    def set_state(self, state):
+        """Return the queue to a snapshot from get_state()"""
+        self.pieces_dealt, self._rng_state, queued = state
+        self._rng.setstate(self._rng_state)
+        self._queue = deque(queued)
+    
+    def next_kind(self):
+        """Take the next shape index from the queue"""
+        if not self._queue:
+            self._fill()
+        self.pieces_dealt += 1
+        return self._queue.popleft()
+    
+    def next_piece(self, x, y):
+        """Take the next piece from the queue as a Tetromino"""
+        return Tetromino(x, y, self.next_kind())
+    
+    def peek(self, count=1):
+        """Get the next shape indices without taking them from the queue"""
+        while len(self._queue) < count:
+            self._fill()
+        return list(islice(self._queue, count))
@@ -0,0 +1,162 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Replay analytics module - re-simulates archived replays into per-piece columnar records
+"""
+
+import argparse
+import os
+from array import array
+from game_engine import GameEngine, EVENT_LOCK, EVENT_LINE_CLEAR
+from replay_recorder import read_replay, apply_record, RECORD_RESET
+from replay_archive import ReplayArchive
+from simulation_farm import default_workers, run_in_workers
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Per-piece columns and their array typecodes
+PIECE_COLUMNS = (
+    ('game_id', 'Q'),      # Archive game id of the session
+    ('game', 'I'),         # Game number within the session
+    ('piece', 'I'),        # Piece number within the game
+    ('kind', 'B'),         # Shape index
+    ('rotation', 'B'),     # Rotation at lock
+    ('x', 'h'),            # Column of the piece origin at lock
+    ('y', 'h'),            # Row of the piece origin at lock
+    ('drop_height', 'H'),  # Drop height passed to scoring
+    ('lines', 'B'),        # Lines cleared by the piece
+    ('combo', 'H'),        # Combo count after the piece
+    ('t_spin', 'B'),       # 1 if the lock was a T-spin
+    ('score', 'I'),        # Points scored by the piece
+    ('time_ms', 'I')       # Session time from the piece's spawn to its lock
+)
+
+def _new_columns():
+    """Create empty per-piece columns"""
+    return {name: array(typecode) for name, typecode in PIECE_COLUMNS}
+
+def _analyze_games(archive_path, game_ids):
+    """Re-simulate archived replays in a worker and return their per-piece columns"""
+    archive = ReplayArchive(archive_path)
+    columns = _new_columns()
+    append = {name: column.append for name, column in columns.items()}
+    
+    for game_id in game_ids:
+        header, records = read_replay(archive.load(game_id))
+        engine = GameEngine(header['width'], header['height'], header['seed'])
+        game = 0
+        spawn_time = 0
+        
+        for timestamp, record_type, value in records:
+            if record_type == RECORD_RESET:
+                game += 1
+                spawn_time = timestamp
+            
+            for event in apply_record(engine, record_type, value):
+                if event['type'] == EVENT_LOCK:
+                    piece = event['piece']
+                    append['game_id'](game_id)
+                    append['game'](game)
+                    append['piece'](engine.pieces_locked - 1)
+                    append['kind'](piece.kind)
+                    append['rotation'](piece.rotation)
+                    append['x'](piece.x)
+                    append['y'](piece.y)
+                    append['drop_height'](event['drop_height'])
+                    append['lines'](0)
+                    append['combo'](engine.game_mechanics.combo_count)
+                    append['t_spin'](event['t_spin'])
+                    append['score'](0)
+                    append['time_ms'](timestamp - spawn_time)
+                    spawn_time = timestamp
+                elif event['type'] == EVENT_LINE_CLEAR:
+                    columns['lines'][-1] = event['lines']
+                    columns['score'][-1] = event['score']
+    
+    archive.close()
+    return columns
+
+class ReplayAnalytics:
+    """Class streaming per-piece records out of an archive with worker processes
+    
+    Each task re-simulates a handful of games straight from the memory-mapped
+    archive, so only game ids go to the workers and only typed columns come
+    back. A bounded number of tasks is in flight, so memory stays flat however
+    many pieces the archive holds.
+    """
+    
+    def __init__(self, archive_path, workers=None, games_per_task=16):
+        """Initialize the pipeline, with a worker per core by default"""
+        if workers is None:
+            workers = default_workers()
+        # Fail here, before any output or worker exists, if there is no archive
+        ReplayArchive(archive_path).close()
+        self.archive_path = archive_path
+        self.workers = workers
+        self.games_per_task = games_per_task
+    
+    def iter_batches(self, game_ids=None, batch_size=65536):
+        """Yield dicts of per-piece columns of about batch_size rows, in completion order"""
+        if game_ids is None:
+            archive = ReplayArchive(self.archive_path)
+            game_ids = range(len(archive))
+            archive.close()
+        game_ids = list(game_ids)
+        tasks = [(self.archive_path, game_ids[i:i + self.games_per_task])
+                 for i in range(0, len(game_ids), self.games_per_task)]
+        batch = _new_columns()
+        
+        results = run_in_workers(_analyze_games, tasks, self.workers)
+        try:
+            for columns in results:
+                for name, column in columns.items():
+                    batch[name].extend(column)
+                if len(batch['piece']) >= batch_size:
+                    yield batch
+                    batch = _new_columns()
+        finally:
+            results.close()
+        
+        if len(batch['piece']):
+            yield batch
+    
+    def write(self, output_dir, game_ids=None, batch_size=65536, progress=None):
+        """Write the per-piece records as numbered .npz column batches; return the row count"""
+        if np is None:
+            raise ImportError("NumPy is required to write columnar batch files")
+        os.makedirs(output_dir, exist_ok=True)
+        
+        rows = 0
+        for number, batch in enumerate(self.iter_batches(game_ids, batch_size)):
+            path = os.path.join(output_dir, f"pieces-{number:05d}.npz")
+            np.savez(path, **{name: np.frombuffer(column, dtype=column.typecode)
+                              for name, column in batch.items()})
+            rows += len(batch['piece'])
+            if progress:
+                progress(number + 1, rows)
+        return rows
+
+def main():
+    """Export the per-piece records of an archive from the command line"""
+    parser = argparse.ArgumentParser(description="Re-simulate archived replays into per-piece records")
+    parser.add_argument('archive', help="replay archive")
+    parser.add_argument('output', help="directory for the .npz batch files")
+    parser.add_argument('--batch-size', type=int, default=65536, help="rows per batch file")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    args = parser.parse_args()
+    
+    try:
+        analytics = ReplayAnalytics(args.archive, workers=args.workers)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    
+    def report(batches, rows):
+        print(f"\r{batches} batches, {rows} pieces", end="", flush=True)
+    
+    analytics.write(args.output, batch_size=args.batch_size, progress=report)
+    print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Replay archive module - packs many replays into one append-only, memory-mapped file
+"""
+
+import argparse
+import heapq
+import mmap
+import os
+import struct
+from replay_recorder import read_replay, apply_record, RECORD_RESET
+from game_engine import GameEngine
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Index file layout: a header, then one fixed-size entry per replay
+INDEX_MAGIC = b'TRPI'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sI')
+INDEX_ENTRY = struct.Struct('<QQIQQII')
+INDEX_FIELDS = ('game_id', 'offset', 'length', 'seed', 'score', 'lines', 'duration')
+
+# The same entry layout as a NumPy dtype, for answering queries without a Python loop
+if np is not None:
+    INDEX_DTYPE = np.dtype([('game_id', '<u8'), ('offset', '<u8'), ('length', '<u4'),
+                            ('seed', '<u8'), ('score', '<u8'), ('lines', '<u4'),
+                            ('duration', '<u4')])
+
+def replay_stats(data):
+    """Re-simulate a replay and get its seed, best game's score and lines, and duration
+    
+    A session can hold several games; the best scoring one stands for the session.
+    """
+    header, records = read_replay(data)
+    engine = GameEngine(header['width'], header['height'], header['seed'])
+    best = (0, 0, header['seed'])
+    
+    for _, record_type, value in records:
+        if record_type == RECORD_RESET:
+            best = max(best, (engine.game_mechanics.score, engine.game_mechanics.lines_cleared, engine.seed))
+        apply_record(engine, record_type, value)
+    best = max(best, (engine.game_mechanics.score, engine.game_mechanics.lines_cleared, engine.seed))
+    
+    return {
+        'seed': best[2],
+        'score': best[0],
+        'lines': best[1],
+        'duration': records[-1][0] if records else 0
+    }
+
+class ReplayArchive:
+    """Class storing replays back to back in one file, with a fixed-size entry index
+    
+    Replays are appended to the data file before their index entry, so an
+    interrupted append leaves at most unreferenced bytes at the end. Both files
+    are read through mmap; load() returns a zero-copy view of one replay.
+    """
+    
+    def __init__(self, path, create=False):
+        """Open the archive at path, with its index at path + '.index', creating it if asked"""
+        self.path = path
+        self.index_path = path + '.index'
+        
+        if not os.path.exists(self.index_path):
+            if not create:
+                raise FileNotFoundError(f"No replay archive at {path}")
+            with open(self.index_path, 'wb') as index:
+                index.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION))
+            open(self.path, 'ab').close()
+        
+        with open(self.index_path, 'rb') as index:
+            magic, version = INDEX_HEADER.unpack(index.read(INDEX_HEADER.size))
+        if magic != INDEX_MAGIC:
+            raise ValueError("Not a replay archive index")
+        if version != INDEX_VERSION:
+            raise ValueError(f"Unsupported replay archive version: {version}")
+        
+        self._data_map = None
+        self._index_map = None
+    
+    def _maps(self):
+        """Get the data and index mmaps, mapping them again after appends"""
+        if self._index_map is None:
+            with open(self.index_path, 'rb') as index:
+                self._index_map = mmap.mmap(index.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.path.getsize(self.path):
+                with open(self.path, 'rb') as data:
+                    self._data_map = mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_map, self._index_map
+    
+    def __len__(self):
+        """Get the number of archived replays"""
+        return (os.path.getsize(self.index_path) - INDEX_HEADER.size) // INDEX_ENTRY.size
+    
+    def append(self, data, stats=None):
+        """Add a replay, re-simulating it for its stats unless given, and return its game id"""
+        if stats is None:
+            stats = replay_stats(data)
+        game_id = len(self)
+        
+        with open(self.path, 'ab') as archive:
+            offset = archive.tell()
+            archive.write(data)
+        with open(self.index_path, 'ab') as index:
+            index.write(INDEX_ENTRY.pack(game_id, offset, len(data), stats['seed'],
+                                         stats['score'], stats['lines'], stats['duration']))
+        
+        self.close()
+        return game_id
+    
+    def append_file(self, path):
+        """Add a replay file and return its game id"""
+        with open(path, 'rb') as replay:
+            return self.append(replay.read())
+    
+    def entry(self, game_id):
+        """Get the index entry of a replay as a dict"""
+        if not 0 <= game_id < len(self):
+            raise IndexError(f"No replay with game id {game_id}")
+        _, index_map = self._maps()
+        values = INDEX_ENTRY.unpack_from(index_map, INDEX_HEADER.size + game_id * INDEX_ENTRY.size)
+        return dict(zip(INDEX_FIELDS, values))
+    
+    def entries(self):
+        """Iterate over the index entries as dicts"""
+        if not len(self):
+            return
+        _, index_map = self._maps()
+        end = INDEX_HEADER.size + len(self) * INDEX_ENTRY.size
+        with memoryview(index_map) as view:
+            for values in INDEX_ENTRY.iter_unpack(view[INDEX_HEADER.size:end]):
+                yield dict(zip(INDEX_FIELDS, values))
+    
+    def load(self, game_id):
+        """Get a replay's bytes as a view into the archive, without copying"""
+        entry = self.entry(game_id)
+        data_map, _ = self._maps()
+        return memoryview(data_map)[entry['offset']:entry['offset'] + entry['length']]
+    
+    def top(self, count=100, key='score'):
+        """Get the index entries of the replays with the highest value of a field"""
+        if not len(self):
+            return []
+        
+        if np is None:
+            return heapq.nlargest(count, self.entries(), key=lambda entry: entry[key])
+        
+        _, index_map = self._maps()
+        index = np.frombuffer(index_map, dtype=INDEX_DTYPE, count=len(self), offset=INDEX_HEADER.size)
+        order = np.argsort(-index[key].astype(np.float64), kind='stable')[:count]
+        return [dict(zip(INDEX_FIELDS, (int(value) for value in index[i]))) for i in order]
+    
+    def close(self):
+        """Unmap the archive; it is mapped again on the next read"""
+        for mapped in (self._data_map, self._index_map):
+            if mapped is None:
+                continue
+            try:
+                mapped.close()
+            except BufferError:
+                # Views from load() are still alive; the map goes away with the last one
+                pass
+        self._data_map = None
+        self._index_map = None
+
+def main():
+    """Add replays to an archive or query it from the command line"""
+    parser = argparse.ArgumentParser(description="Pack Tetris replays into an indexed archive")
+    parser.add_argument('archive', help="archive file, created by add if missing")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    add_parser = subparsers.add_parser('add', help="append replay files")
+    add_parser.add_argument('replays', nargs='+', help="replay files")
+    top_parser = subparsers.add_parser('top', help="list the best games")
+    top_parser.add_argument('--by', choices=('score', 'lines', 'duration'), default='score',
+                            help="field to rank by")
+    top_parser.add_argument('-n', type=int, default=100, help="number of games")
+    args = parser.parse_args()
+    
+    try:
+        archive = ReplayArchive(args.archive, create=args.command == 'add')
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    if args.command == 'add':
+        for path in args.replays:
+            game_id = archive.append_file(path)
+            print(f"{path}: game {game_id}")
+    else:
+        for entry in archive.top(args.n, args.by):
+            print(f"Game {entry['game_id']}: score {entry['score']}, lines {entry['lines']}, "
+                  f"{entry['duration'] / 1000:.1f}s, seed {entry['seed']}")
+    archive.close()
+
+if __name__ == "__main__":
+    main()
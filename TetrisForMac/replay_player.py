@@ -0,0 +1,231 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Replay player module - re-simulates recorded sessions with keyframes for fast seeking
+"""
+
+import argparse
+from bisect import bisect_right
+from colors import COLORS
+from game_engine import GameEngine, EVENT_LOCK, EVENT_SPAWN
+from replay_recorder import read_replay, apply_record, RECORD_SPAWN
+
+# Viewer layout, matching the game window
+SCREEN_WIDTH = 800
+SCREEN_HEIGHT = 700
+BLOCK_SIZE = 30
+BOARD_POSITION_Y = 50
+FPS = 60
+MAX_SPEED = 64
+SEEK_STEP = 10000  # ms
+
+class ReplayPlayer:
+    """Class re-simulating a replay headlessly, with a keyframe every N pieces
+    
+    Seeking restores the last keyframe before the target and replays forward
+    from there. Keyframes are taken the first time playback passes each point,
+    so scrubbing back and forth only re-simulates up to N pieces.
+    """
+    
+    def __init__(self, data, keyframe_interval=50):
+        """Load the replay bytes and rewind to the start"""
+        self.header, self.records = read_replay(data)
+        self.record_times = [timestamp for timestamp, _, _ in self.records]
+        self.keyframe_interval = keyframe_interval
+        
+        self.engine = GameEngine(self.header['width'], self.header['height'], self.header['seed'])
+        self.engine.subscribe(self._handle_event, [EVENT_LOCK, EVENT_SPAWN])
+        
+        # Playback position: the index of the next record, the session time in
+        # milliseconds and the pieces locked so far
+        self.position = 0
+        self.current_time = 0
+        self.pieces = 0
+        self.last_spawn = None
+        self.desyncs = 0
+        
+        # Keyframes as (record index, pieces locked, engine snapshot), in record order
+        self.keyframes = [(0, 0, self.engine.snapshot())]
+        self.keyframe_positions = [0]
+    
+    @classmethod
+    def from_file(cls, path, keyframe_interval=50):
+        """Load a replay file"""
+        with open(path, 'rb') as replay:
+            return cls(replay.read(), keyframe_interval)
+    
+    @property
+    def duration(self):
+        """Get the length of the session in milliseconds"""
+        return self.record_times[-1] if self.records else 0
+    
+    @property
+    def finished(self):
+        """Check if every record has been played"""
+        return self.position >= len(self.records)
+    
+    def _handle_event(self, event):
+        """Count locked pieces and remember the last spawned kind"""
+        if event['type'] == EVENT_LOCK:
+            self.pieces += 1
+        else:
+            self.last_spawn = event['piece'].kind
+    
+    def step(self):
+        """Play the next record and return it"""
+        record = self.records[self.position]
+        _, record_type, value = record
+        apply_record(self.engine, record_type, value)
+        if record_type == RECORD_SPAWN and value != self.last_spawn:
+            # The recording saw a different piece, so the simulation has drifted
+            self.desyncs += 1
+        self.position += 1
+        
+        # Keep a keyframe every N pieces the first time playback gets there
+        last_position, last_pieces, _ = self.keyframes[-1]
+        if self.position > last_position and self.pieces >= last_pieces + self.keyframe_interval:
+            self.keyframes.append((self.position, self.pieces, self.engine.snapshot()))
+            self.keyframe_positions.append(self.position)
+        return record
+    
+    def seek_position(self, position):
+        """Move playback to just before the given record index"""
+        position = max(0, min(position, len(self.records)))
+        
+        # Jump to the nearest keyframe unless playing forward from here is shorter
+        index = bisect_right(self.keyframe_positions, position) - 1
+        keyframe_position, pieces, snapshot = self.keyframes[index]
+        if position < self.position or keyframe_position > self.position:
+            self.engine.restore(snapshot)
+            self.position = keyframe_position
+            self.pieces = pieces
+            self.last_spawn = self.engine.current_piece.kind
+        
+        while self.position < position:
+            self.step()
+        self.current_time = self.record_times[position - 1] if position else 0
+    
+    def seek(self, timestamp):
+        """Move playback to the given time in milliseconds"""
+        timestamp = max(0, min(timestamp, self.duration))
+        self.seek_position(bisect_right(self.record_times, timestamp))
+        self.current_time = timestamp
+    
+    def advance(self, milliseconds):
+        """Play the records of the next stretch of session time"""
+        self.seek(self.current_time + milliseconds)
+    
+    def play_to_end(self):
+        """Play every remaining record"""
+        self.seek_position(len(self.records))
+
+def view_replay(player, speed=1):
+    """Show a replay in a window, with pause, seeking and 1x to 64x speed"""
+    # Rendering is optional, so headless playback never loads pygame
+    import pygame
+    from graphics import Graphics
+    from ui import UI
+    
+    width = player.engine.width
+    height = player.engine.height
+    board_x = (SCREEN_WIDTH - width * BLOCK_SIZE) // 2
+    
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Tetris for Mac - Replay")
+    clock = pygame.time.Clock()
+    graphics = Graphics(BLOCK_SIZE)
+    ui = UI(SCREEN_WIDTH, SCREEN_HEIGHT, BLOCK_SIZE)
+    paused = False
+    
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    speed = min(speed * 2, MAX_SPEED)
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed // 2, 1)
+                elif event.key == pygame.K_LEFT:
+                    player.seek(player.current_time - SEEK_STEP)
+                elif event.key == pygame.K_RIGHT:
+                    player.seek(player.current_time + SEEK_STEP)
+        
+        # Advance by the session time that passed at this speed
+        elapsed = clock.tick(FPS)
+        if not paused and not player.finished:
+            player.advance(elapsed * speed)
+        
+        engine = player.engine
+        screen.fill(COLORS['BLACK'])
+        pygame.draw.rect(
+            screen,
+            COLORS['GRAY'],
+            (board_x - 2, BOARD_POSITION_Y - 2, width * BLOCK_SIZE + 4, height * BLOCK_SIZE + 4),
+            2
+        )
+        for y in range(height):
+            for x in range(width):
+                color = engine.game_board.get_cell_color(x, y)
+                if color:
+                    graphics.draw_block(screen, board_x + x * BLOCK_SIZE,
+                                        BOARD_POSITION_Y + y * BLOCK_SIZE, color)
+        if not engine.game_over:
+            piece = engine.current_piece
+            for x, y in piece.cells:
+                graphics.draw_block(screen, board_x + (piece.x + x) * BLOCK_SIZE,
+                                    BOARD_POSITION_Y + (piece.y + y) * BLOCK_SIZE, piece.color)
+        
+        ui.draw_game_info(
+            screen,
+            engine.game_mechanics.score,
+            engine.game_mechanics.level,
+            engine.game_mechanics.lines_cleared,
+            engine.next_piece,
+            50, 100, 200
+        )
+        
+        # Playback status
+        status = (f"{player.current_time / 1000:.1f}s / {player.duration / 1000:.1f}s  "
+                  f"{speed}x{'  PAUSED' if paused else ''}")
+        ui.draw_text(screen, status, ui.small_font, COLORS['WHITE'], 50, 10)
+        ui.draw_text(screen, "Space: Pause  Up/Down: Speed  Left/Right: Seek 10s",
+                     ui.small_font, (200, 200, 200), 50, SCREEN_HEIGHT - 30)
+        
+        pygame.display.flip()
+    
+    pygame.quit()
+
+def main():
+    """Play back a replay file from the command line"""
+    parser = argparse.ArgumentParser(description="Play back a recorded Tetris session")
+    parser.add_argument('replay', help="replay file")
+    parser.add_argument('--view', action='store_true', help="show the replay in a window")
+    parser.add_argument('--speed', type=int, default=1, help="playback speed from 1 to 64")
+    parser.add_argument('--seek', type=float, default=0.0, help="start this many seconds in")
+    parser.add_argument('--keyframe-interval', type=int, default=50, help="pieces between keyframes")
+    args = parser.parse_args()
+    
+    player = ReplayPlayer.from_file(args.replay, args.keyframe_interval)
+    player.seek(int(args.seek * 1000))
+    if args.view:
+        view_replay(player, max(1, min(args.speed, MAX_SPEED)))
+        return
+    
+    player.play_to_end()
+    mechanics = player.engine.game_mechanics
+    print(f"Seed: {player.header['seed']}")
+    print(f"Duration: {player.duration / 1000:.1f}s")
+    print(f"Pieces: {player.pieces}")
+    print(f"Score: {mechanics.score}  Lines: {mechanics.lines_cleared}  Level: {mechanics.level}")
+    print(f"Keyframes: {len(player.keyframes)}")
+    if player.desyncs:
+        print(f"Warning: {player.desyncs} spawns differ from the recording")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Replay recorder module - streams sessions to a compact binary replay file
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from game_engine import PLAYER_ACTIONS, ACTION_GRAVITY
+
+# File layout: magic, version, then varints for the board width, board height and
+# first seed, followed by records. Each record is a varint of the milliseconds since
+# the previous record, a record type byte and, for some types, a varint value.
+REPLAY_MAGIC = b'TRPL'
+REPLAY_VERSION = 1
+
+# Engine actions by their code in a replay; codes double as record types
+REPLAY_ACTIONS = PLAYER_ACTIONS + (ACTION_GRAVITY,)
+ACTION_CODES = {action: code for code, action in enumerate(REPLAY_ACTIONS)}
+
+# Record types besides the action codes
+RECORD_INPUT = 16  # Value: bitmask of the input flags raised in a frame
+RECORD_SPAWN = 17  # Value: kind of the piece that spawned
+RECORD_RESET = 18  # Value: seed of the new game
+RECORD_END = 19    # No value; the session ended cleanly
+
+# Input flags of InputHandler.process_events by their bit in an input record
+INPUT_FLAGS = ('quit', 'move_left', 'move_right', 'move_down', 'rotate', 'hard_drop',
+               'pause', 'mute', 'restart', 'change_style', 'autoplay')
+
+def default_replay_dir():
+    """Get the user-writable directory for session replays, overridable with TETRIS_REPLAY_DIR"""
+    directory = os.environ.get('TETRIS_REPLAY_DIR')
+    if directory:
+        return directory
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'TetrisForMac', 'replays')
+
+def encode_varint(value, out):
+    """Append an unsigned LEB128 varint to a bytearray"""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decode_varint(data, pos):
+    """Read an unsigned LEB128 varint, returning (value, next position)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def read_replay(data):
+    """Parse replay bytes into a header dict and a list of (time ms, type, value) records"""
+    if data[:4] != REPLAY_MAGIC:
+        raise ValueError("Not a replay file")
+    if data[4] != REPLAY_VERSION:
+        raise ValueError(f"Unsupported replay version: {data[4]}")
+    
+    pos = 5
+    width, pos = decode_varint(data, pos)
+    height, pos = decode_varint(data, pos)
+    seed, pos = decode_varint(data, pos)
+    header = {'width': width, 'height': height, 'seed': seed}
+    
+    records = []
+    timestamp = 0
+    while pos < len(data):
+        delta, pos = decode_varint(data, pos)
+        timestamp += delta
+        record_type = data[pos]
+        pos += 1
+        value = None
+        if record_type in (RECORD_INPUT, RECORD_SPAWN, RECORD_RESET):
+            value, pos = decode_varint(data, pos)
+        records.append((timestamp, record_type, value))
+    return header, records
+
+def apply_record(engine, record_type, value):
+    """Play one replay record on a game engine and return the events it produced"""
+    if record_type < len(REPLAY_ACTIONS):
+        return engine.step(REPLAY_ACTIONS[record_type])
+    if record_type == RECORD_RESET:
+        engine.reset(value)
+    return []
+
+class ReplayRecorder:
+    """Class recording a session's actions and inputs, written by a background thread"""
+    
+    def __init__(self, path, width, height, seed, chunk_size=4096):
+        """Open the replay file and start the writer thread"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.start_time = time.monotonic()
+        self.last_time = 0
+        self.closed = False
+        
+        self.buffer = bytearray(REPLAY_MAGIC)
+        self.buffer.append(REPLAY_VERSION)
+        for value in (width, height, seed):
+            encode_varint(value, self.buffer)
+        
+        # Full chunks go to the writer thread, so the caller never waits on the disk
+        self.chunks = queue.Queue()
+        self.file = open(path, 'wb')
+        self.writer = threading.Thread(target=self._write_chunks, name="ReplayWriter", daemon=True)
+        self.writer.start()
+    
+    def _write_chunks(self):
+        """Write queued chunks until the end marker arrives"""
+        while True:
+            chunk = self.chunks.get()
+            if chunk is None:
+                break
+            self.file.write(chunk)
+        self.file.close()
+    
+    def _record(self, record_type, value=None):
+        """Append one record, handing the buffer over when it fills a chunk"""
+        if self.closed:
+            return
+        now = int((time.monotonic() - self.start_time) * 1000)
+        encode_varint(now - self.last_time, self.buffer)
+        self.last_time = now
+        self.buffer.append(record_type)
+        if value is not None:
+            encode_varint(value, self.buffer)
+        
+        if len(self.buffer) >= self.chunk_size:
+            self.chunks.put(bytes(self.buffer))
+            self.buffer.clear()
+    
+    def record_action(self, action):
+        """Record an action stepped into the game engine"""
+        self._record(ACTION_CODES[action])
+    
+    def record_input(self, input_actions):
+        """Record the input flags raised in a frame, if any"""
+        mask = 0
+        for bit, name in enumerate(INPUT_FLAGS):
+            if input_actions.get(name):
+                mask |= 1 << bit
+        if mask:
+            self._record(RECORD_INPUT, mask)
+    
+    def record_spawn(self, kind):
+        """Record the kind of a piece that spawned"""
+        self._record(RECORD_SPAWN, kind)
+    
+    def record_reset(self, seed):
+        """Record the start of a new game"""
+        self._record(RECORD_RESET, seed)
+    
+    def close(self):
+        """Write the end marker, flush everything to disk and stop the writer"""
+        if self.closed:
+            return
+        self._record(RECORD_END)
+        self.closed = True
+        self.chunks.put(bytes(self.buffer))
+        self.buffer.clear()
+        self.chunks.put(None)
+        self.writer.join()
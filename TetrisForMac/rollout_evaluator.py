@@ -0,0 +1,153 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Rollout evaluator module - scores placements with Monte Carlo rollouts in worker processes
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from game_board import GameBoard
+from game_mechanics import GameMechanics
+from piece_queue import PieceQueue
+from tetromino import PieceState
+from move_generator import generate_placements
+from board_evaluator import score_placements, weight_vector
+from simulation_farm import default_workers
+
+# Rollout policies
+POLICY_RANDOM = 'random'
+POLICY_GREEDY = 'greedy'
+
+# Root board of the current worker, rebuilt only when the root changes
+_worker_root = {'key': None, 'memory': None, 'board': None}
+
+def _attach_root(name, version, width, height):
+    """Get the worker's copy of the root board from shared memory"""
+    if _worker_root['key'] != (name, version):
+        if _worker_root['memory'] is None or _worker_root['memory'].name != name:
+            _worker_root['memory'] = shared_memory.SharedMemory(name=name)
+        data = _worker_root['memory'].buf
+        cells = [list(data[y * width:(y + 1) * width]) for y in range(height)]
+        board = GameBoard(width, height)
+        board.set_cells(cells)
+        _worker_root['key'] = (name, version)
+        _worker_root['board'] = board
+    return _worker_root['board']
+
+def _greedy_placement(board, placements, weights):
+    """Pick the placement the board evaluator likes best"""
+    scores, _, _ = score_placements(board, [placement.piece for placement in placements], weights)
+    return placements[scores.index(max(scores))]
+
+def _rollout_task(root, candidate, next_kind, seeds, horizon, policy, weights, spawn_x, loss_penalty):
+    """Play one rollout per seed after a candidate placement and return their values"""
+    board = _attach_root(*root[:4])
+    mechanics = GameMechanics(board)
+    (mechanics.score, mechanics.level, mechanics.lines_cleared,
+     mechanics.combo_count, mechanics.back_to_back_tetris) = root[4]
+    start_score = mechanics.score
+    
+    values = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        piece_queue = PieceQueue(seed)
+        tokens = [mechanics.apply(candidate)]
+        kind = next_kind
+        value = 0
+        
+        # Play the known next piece, then pieces from the rollout's own bag
+        for _ in range(horizon):
+            placements = generate_placements(board, PieceState(kind, 0, spawn_x, 0), include_paths=False)
+            if not placements:
+                value -= loss_penalty
+                break
+            if policy == POLICY_GREEDY:
+                placement = _greedy_placement(board, placements, weights)
+            else:
+                placement = rng.choice(placements)
+            tokens.append(mechanics.apply(placement.piece))
+            kind = piece_queue.next_kind()
+        
+        value += mechanics.score - start_score
+        values.append(value)
+        
+        # Unwind the rollout so the root board can be reused
+        for token in reversed(tokens):
+            mechanics.revert(token)
+    
+    return values
+
+class RolloutEvaluator:
+    """Class estimating placement values from Monte Carlo rollouts in parallel
+    
+    The root board is written once per decision to shared memory as a grid of
+    piece ids; each task only carries its candidate placement and rollout seeds,
+    and workers rebuild the root board when its version changes.
+    """
+    
+    def __init__(self, width=10, height=20, rollouts=16, horizon=8, policy=POLICY_GREEDY,
+                 weights=None, loss_penalty=1000, workers=None, seed=0):
+        """Initialize the evaluator, its shared root board and its worker pool"""
+        if workers is None:
+            workers = default_workers()
+        self.width = width
+        self.height = height
+        self.rollouts = rollouts
+        self.horizon = horizon
+        self.policy = policy
+        self.weights = weight_vector(weights)
+        self.loss_penalty = loss_penalty
+        self.workers = workers
+        self.seed = seed
+        
+        self.root_memory = shared_memory.SharedMemory(create=True, size=width * height)
+        self.root_version = 0
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+    
+    def evaluate(self, engine, candidates):
+        """Get the (mean, variance) of the rollout values of each candidate placement"""
+        # Publish the root board once for every task of this decision
+        self.root_version += 1
+        cells = engine.game_board.get_cells()
+        self.root_memory.buf[:self.width * self.height] = bytes(
+            piece_id for row in cells for piece_id in row)
+        mechanics = engine.game_mechanics
+        root = (self.root_memory.name, self.root_version, self.width, self.height,
+                (mechanics.score, mechanics.level, mechanics.lines_cleared,
+                 mechanics.combo_count, mechanics.back_to_back_tetris))
+        
+        # Every candidate sees the same piece sequences, so their values compare fairly
+        rng = random.Random(self.seed * 1000003 + self.root_version)
+        seeds = [rng.getrandbits(32) for _ in range(self.rollouts)]
+        
+        futures = []
+        for candidate in candidates:
+            piece = getattr(candidate, 'piece', candidate)
+            futures.append(self.executor.submit(
+                _rollout_task, root, piece, engine.next_piece.shape_index, seeds,
+                self.horizon, self.policy, self.weights, engine.spawn_x, self.loss_penalty))
+        
+        results = []
+        for future in futures:
+            values = future.result()
+            mean = sum(values) / len(values)
+            if len(values) > 1:
+                variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+            else:
+                variance = 0.0
+            results.append((mean, variance))
+        return results
+    
+    def close(self):
+        """Stop the workers and free the shared root board"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.root_memory.close()
+        self.root_memory.unlink()
+    
+    def __enter__(self):
+        """Use the evaluator as a context manager that closes it on exit"""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the evaluator"""
+        self.close()
@@ -0,0 +1,170 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Simulation farm module - plays headless games in parallel across all cores
+"""
+
+import argparse
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from game_engine import (GameEngine, ACTION_MOVE_LEFT, ACTION_MOVE_RIGHT, ACTION_ROTATE,
+                         ACTION_HARD_DROP)
+
+def default_workers():
+    """Get the number of cores this process may run on, the default worker count"""
+    if hasattr(os, 'sched_getaffinity'):
+        return max(1, len(os.sched_getaffinity(0)))
+    return os.cpu_count() or 1
+
+def random_policy(engine, rng):
+    """Pick a random rotation and column for the current piece"""
+    actions = [ACTION_ROTATE] * rng.randrange(4)
+    shift = rng.randint(-engine.width // 2, engine.width // 2)
+    actions += [ACTION_MOVE_RIGHT if shift > 0 else ACTION_MOVE_LEFT] * abs(shift)
+    actions.append(ACTION_HARD_DROP)
+    return actions
+
+def play_game(seed, policy=None, max_pieces=None):
+    """Play one headless game and return its result"""
+    if policy is None:
+        policy = random_policy
+    
+    engine = GameEngine(seed=seed)
+    rng = random.Random(seed)
+    steps = 0
+    
+    while not engine.game_over:
+        if max_pieces is not None and engine.pieces_locked >= max_pieces:
+            break
+        
+        # Play the policy's actions for this piece, then make sure it lands
+        pieces_locked = engine.pieces_locked
+        for action in policy(engine, rng):
+            engine.step(action)
+            steps += 1
+            if engine.pieces_locked != pieces_locked:
+                break
+        if engine.pieces_locked == pieces_locked and not engine.game_over:
+            engine.step(ACTION_HARD_DROP)
+            steps += 1
+    
+    return {
+        'seed': seed,
+        'score': engine.game_mechanics.score,
+        'lines': engine.game_mechanics.lines_cleared,
+        'pieces': engine.pieces_locked,
+        'level': engine.game_mechanics.level,
+        'steps': steps,
+        'game_over': engine.game_over
+    }
+
+def run_in_workers(function, tasks, workers, cancelled=None):
+    """Call function(*task) for each task in worker processes and yield results as they finish
+    
+    At most two tasks per worker are in flight, so memory stays flat however
+    many tasks there are. Tasks start in order; once cancelled() is true no
+    more are started and results still running are discarded.
+    """
+    tasks = list(tasks)
+    tasks.reverse()
+    
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Keep a bounded number of tasks in flight
+        pending = set()
+        while tasks or pending:
+            while tasks and len(pending) < workers * 2 and not (cancelled and cancelled()):
+                pending.add(executor.submit(function, *tasks.pop()))
+            if not pending:
+                break
+            
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+            
+            if cancelled and cancelled():
+                break
+    finally:
+        # Runs on cancel, on errors and when the caller stops iterating early
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _play_chunk(jobs, max_pieces):
+    """Play a chunk of (index, seed, policy) games in a worker process"""
+    return [(index, play_game(seed, policy, max_pieces)) for index, seed, policy in jobs]
+
+class SimulationFarm:
+    """Class for sharding seeded headless games across worker processes"""
+    
+    def __init__(self, workers=None, chunk_size=8):
+        """Initialize the farm, with a worker per core by default"""
+        if workers is None:
+            workers = default_workers()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.cancelled = False
+    
+    def cancel(self):
+        """Stop dispatching games; results already running are discarded"""
+        self.cancelled = True
+    
+    def run(self, seeds, policy=None, max_pieces=None, progress=None):
+        """Play a game per seed and yield each result as soon as its chunk finishes"""
+        results = self.run_jobs([(seed, policy) for seed in seeds], max_pieces, progress)
+        try:
+            for _, result in results:
+                yield result
+        finally:
+            results.close()
+    
+    def run_jobs(self, jobs, max_pieces=None, progress=None):
+        """Play a game per (seed, policy) job and yield (job index, result) pairs"""
+        jobs = [(index, seed, policy) for index, (seed, policy) in enumerate(jobs)]
+        chunks = [(jobs[i:i + self.chunk_size], max_pieces)
+                  for i in range(0, len(jobs), self.chunk_size)]
+        completed = 0
+        self.cancelled = False
+        
+        results = run_in_workers(_play_chunk, chunks, self.workers, lambda: self.cancelled)
+        try:
+            for chunk_results in results:
+                for index, result in chunk_results:
+                    completed += 1
+                    if progress:
+                        progress(completed, len(jobs))
+                    yield index, result
+        finally:
+            results.close()
+
+def main():
+    """Run a batch of seeded games from the command line and print a summary"""
+    parser = argparse.ArgumentParser(description="Play headless Tetris games in parallel")
+    parser.add_argument('--games', type=int, default=100, help="number of games to play")
+    parser.add_argument('--first-seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('--max-pieces', type=int, default=None, help="stop each game after this many pieces")
+    args = parser.parse_args()
+    
+    farm = SimulationFarm(workers=args.workers)
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    
+    def report(completed, total):
+        print(f"\r{completed}/{total} games", end="", flush=True)
+    
+    results = []
+    try:
+        for result in farm.run(seeds, max_pieces=args.max_pieces, progress=report):
+            results.append(result)
+    except KeyboardInterrupt:
+        farm.cancel()
+        print("\nCancelled")
+    print()
+    
+    if results:
+        print(f"Games: {len(results)} on {farm.workers} workers")
+        print(f"Mean score: {sum(r['score'] for r in results) / len(results):.1f}")
+        print(f"Mean lines: {sum(r['lines'] for r in results) / len(results):.2f}")
+        print(f"Mean pieces: {sum(r['pieces'] for r in results) / len(results):.1f}")
+        print(f"Best score: {max(r['score'] for r in results)}")
+
+if __name__ == "__main__":
+    main()
@@ -123,6 +123,13 @@ class SoundEffects:
         if self.sound_enabled and sound_name in self.sounds:
             self.sounds[sound_name].play()
     
+    def play_many(self, sound_names):
+        """Play several sound effects started in the same frame"""
+        if self.sound_enabled:
+            for sound_name in sound_names:
+                if sound_name in self.sounds:
+                    self.sounds[sound_name].play()
+    
     def set_volume(self, volume):
         """Set volume for all sound effects (0.0 to 1.0)"""
         if self.sound_enabled:
@@ -4,6 +4,7 @@ Tetromino module - defines the Tetromino class and shapes
 """
 
 import random
+from collections import namedtuple
 from colors import COLORS
 
 # Tetromino shapes (each shape is a 4x4 grid)
@@ -63,50 +64,161 @@ SHAPE_COLORS = [
     COLORS['RED']       # Z piece
 ]
 
+def _rotate_shape(shape):
+    """Rotate a shape grid 90 degrees clockwise"""
+    height = len(shape)
+    width = len(shape[0])
+    return tuple(tuple(shape[height - 1 - y][x] for y in range(height)) for x in range(width))
+
+def _build_rotation_tables():
+    """Precompute the per-rotation tables of every shape"""
+    shapes, cells, bounds, row_masks = [], [], [], []
+    bottom_profiles, left_profiles, right_profiles = [], [], []
+    
+    for shape in SHAPES:
+        shape = tuple(tuple(row) for row in shape)
+        shape_rotations = []
+        for rotation in range(4):
+            shape_rotations.append(shape)
+            shape = _rotate_shape(shape)
+        shapes.append(tuple(shape_rotations))
+        
+        rotation_cells, rotation_bounds, rotation_masks = [], [], []
+        rotation_bottoms, rotation_lefts, rotation_rights = [], [], []
+        for grid in shape_rotations:
+            offsets = tuple((x, y) for y, row in enumerate(grid)
+                            for x, cell in enumerate(row) if cell)
+            left = min(x for x, _ in offsets)
+            right = max(x for x, _ in offsets)
+            top = min(y for _, y in offsets)
+            bottom = max(y for _, y in offsets)
+            
+            # One bitmask per occupied row, bit 0 being the leftmost column
+            masks = [0] * (bottom - top + 1)
+            for x, y in offsets:
+                masks[y - top] |= 1 << (x - left)
+            
+            rotation_cells.append(offsets)
+            rotation_bounds.append((left, top, right, bottom))
+            rotation_masks.append(tuple(masks))
+            rotation_bottoms.append(tuple(max(y for x, y in offsets if x == column)
+                                          for column in range(left, right + 1)))
+            rotation_lefts.append(tuple(min(x for x, y in offsets if y == row)
+                                        for row in range(top, bottom + 1)))
+            rotation_rights.append(tuple(max(x for x, y in offsets if y == row)
+                                         for row in range(top, bottom + 1)))
+        
+        cells.append(tuple(rotation_cells))
+        bounds.append(tuple(rotation_bounds))
+        row_masks.append(tuple(rotation_masks))
+        bottom_profiles.append(tuple(rotation_bottoms))
+        left_profiles.append(tuple(rotation_lefts))
+        right_profiles.append(tuple(rotation_rights))
+    
+    return (tuple(shapes), tuple(cells), tuple(bounds), tuple(row_masks),
+            tuple(bottom_profiles), tuple(left_profiles), tuple(right_profiles))
+
+# Rotation tables, all indexed as TABLE[shape_index][rotation]:
+#   ROTATED_SHAPES  - the shape grid
+#   PIECE_CELLS     - (x, y) offsets of the occupied cells
+#   PIECE_BOUNDS    - (left, top, right, bottom) of the occupied cells
+#   PIECE_ROW_MASKS - one bitmask per row from top to bottom, bit 0 being the left column
+#   BOTTOM_PROFILES - lowest occupied y of each column from left to right
+#   LEFT_PROFILES   - leftmost occupied x of each row from top to bottom
+#   RIGHT_PROFILES  - rightmost occupied x of each row from top to bottom
+(ROTATED_SHAPES, PIECE_CELLS, PIECE_BOUNDS, PIECE_ROW_MASKS,
+ BOTTOM_PROFILES, LEFT_PROFILES, RIGHT_PROFILES) = _build_rotation_tables()
+
+class PieceState(namedtuple('PieceState', ['kind', 'rotation', 'x', 'y'])):
+    """Immutable, hashable piece placement that refers to the shared rotation tables"""
+    
+    __slots__ = ()
+    
+    @property
+    def shape_index(self):
+        """Get the shape index (same as kind)"""
+        return self.kind
+    
+    @property
+    def color(self):
+        """Get the color of the piece"""
+        return SHAPE_COLORS[self.kind]
+    
+    @property
+    def shape(self):
+        """Get the shape grid for the current rotation"""
+        return ROTATED_SHAPES[self.kind][self.rotation]
+    
+    @property
+    def cells(self):
+        """Get the (x, y) offsets of the occupied cells for the current rotation"""
+        return PIECE_CELLS[self.kind][self.rotation]
+    
+    def moved(self, dx=0, dy=0):
+        """Get the state shifted by the given offset"""
+        return PieceState(self.kind, self.rotation, self.x + dx, self.y + dy)
+    
+    def rotated(self, clockwise=True):
+        """Get the state rotated by a quarter turn"""
+        # Special case for O piece (no rotation needed)
+        if self.kind == 3:
+            return self
+        return PieceState(self.kind, (self.rotation + (1 if clockwise else -1)) % 4, self.x, self.y)
+
 class Tetromino:
     """Class representing a tetromino piece"""
     
-    def __init__(self, x, y):
-        """Initialize a new random tetromino"""
-        self.shape_index = random.randint(0, len(SHAPES) - 1)
-        self.shape = SHAPES[self.shape_index]
-        self.color = SHAPE_COLORS[self.shape_index]
+    __slots__ = ('shape_index', 'x', 'y', 'rotation')
+    
+    def __init__(self, x, y, shape_index=None):
+        """Initialize a new tetromino, random unless a shape index is given"""
+        if shape_index is None:
+            shape_index = random.randint(0, len(SHAPES) - 1)
+        self.shape_index = shape_index
         self.x = x
         self.y = y
         self.rotation = 0
     
+    @classmethod
+    def from_state(cls, state):
+        """Create a tetromino from a PieceState"""
+        tetromino = cls(state.x, state.y, state.kind)
+        tetromino.rotation = state.rotation
+        return tetromino
+    
+    def to_state(self):
+        """Get an immutable PieceState snapshot of the tetromino"""
+        return PieceState(self.shape_index, self.rotation, self.x, self.y)
+    
+    @property
+    def kind(self):
+        """Get the shape index (same as shape_index)"""
+        return self.shape_index
+    
+    @property
+    def color(self):
+        """Get the color of the piece"""
+        return SHAPE_COLORS[self.shape_index]
+    
+    @property
+    def shape(self):
+        """Get the shape grid for the current rotation"""
+        return ROTATED_SHAPES[self.shape_index][self.rotation]
+    
+    @property
+    def cells(self):
+        """Get the (x, y) offsets of the occupied cells for the current rotation"""
+        return PIECE_CELLS[self.shape_index][self.rotation]
+    
     def rotate(self, clockwise=True):
         """Rotate the tetromino"""
         # Special case for O piece (no rotation needed)
         if self.shape_index == 3:
             return
         
-        # Create a new rotated shape
-        old_shape = self.shape
-        height = len(old_shape)
-        width = len(old_shape[0])
-        
-        if clockwise:
-            # Clockwise rotation
-            new_shape = [[0 for _ in range(height)] for _ in range(width)]
-            for y in range(height):
-                for x in range(width):
-                    new_shape[x][height - 1 - y] = old_shape[y][x]
-        else:
-            # Counter-clockwise rotation
-            new_shape = [[0 for _ in range(height)] for _ in range(width)]
-            for y in range(height):
-                for x in range(width):
-                    new_shape[width - 1 - x][y] = old_shape[y][x]
-        
-        self.shape = new_shape
+        # The rotated shapes are precomputed, so only the index changes
         self.rotation = (self.rotation + (1 if clockwise else -1)) % 4
     
     def get_positions(self):
         """Get the absolute positions of all blocks in the tetromino"""
-        positions = []
-        for y, row in enumerate(self.shape):
-            for x, cell in enumerate(row):
-                if cell:
-                    positions.append((self.x + x, self.y + y))
-        return positions
+        return [(self.x + x, self.y + y) for x, y in self.cells]
@@ -160,28 +160,26 @@ class UI:
             preview_x = x + width//2 - len(next_piece.shape[0]) * self.block_size // 2
             preview_y = y_offset + 50
             
-            for y_idx, row in enumerate(next_piece.shape):
-                for x_idx, cell in enumerate(row):
-                    if cell:
-                        pygame.draw.rect(
-                            surface, 
-                            next_piece.color,
-                            (preview_x + x_idx * self.block_size, 
-                             preview_y + y_idx * self.block_size,
-                             self.block_size, self.block_size)
-                        )
-                        pygame.draw.rect(
-                            surface, 
-                            (0, 0, 0),
-                            (preview_x + x_idx * self.block_size, 
-                             preview_y + y_idx * self.block_size,
-                             self.block_size, self.block_size),
-                            1
-                        )
+            for x_idx, y_idx in next_piece.cells:
+                pygame.draw.rect(
+                    surface, 
+                    next_piece.color,
+                    (preview_x + x_idx * self.block_size, 
+                     preview_y + y_idx * self.block_size,
+                     self.block_size, self.block_size)
+                )
+                pygame.draw.rect(
+                    surface, 
+                    (0, 0, 0),
+                    (preview_x + x_idx * self.block_size, 
+                     preview_y + y_idx * self.block_size,
+                     self.block_size, self.block_size),
+                    1
+                )
     
     def draw_controls(self, surface, x, y, width):
         """Draw controls information panel"""
-        panel_height = 200
+        panel_height = 225
         y_offset = self.draw_panel(surface, x, y, width, panel_height, "CONTROLS")
         
         controls = [
@@ -191,7 +189,8 @@ class UI:
             ("Space", "Hard Drop"),
             ("P", "Pause Game"),
             ("M", "Mute Sound"),
-            ("R", "Restart (Game Over)")
+            ("R", "Restart (Game Over)"),
+            ("A", "Autoplay")
         ]
         
         for i, (key, action) in enumerate(controls):
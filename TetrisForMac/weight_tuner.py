@@ -0,0 +1,178 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Weight tuner module - tunes the board evaluator weights with the cross-entropy method
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+from board_evaluator import FEATURES, weight_vector
+from autoplay_bot import AutoplayBot
+from simulation_farm import SimulationFarm
+
+class WeightTuner:
+    """Class tuning evaluator weights over seeded games, checkpointing to disk
+    
+    Each generation samples a population of weight vectors from a Gaussian,
+    plays every candidate on the same seeded games across the simulation farm,
+    and refits the Gaussian to the best candidates. Candidates are sampled from
+    the tuner seed and the generation number, so an interrupted run resumes
+    from its checkpoint without replaying finished candidates.
+    """
+    
+    def __init__(self, checkpoint_path, population=32, elite_fraction=0.25, games=8,
+                 first_seed=0, max_pieces=500, initial_std=2.0, noise=1.0, seed=0,
+                 farm=None):
+        """Initialize the tuner, resuming from the checkpoint if it exists"""
+        self.checkpoint_path = checkpoint_path
+        self.population = population
+        self.elite_count = max(1, int(population * elite_fraction))
+        self.game_seeds = list(range(first_seed, first_seed + games))
+        self.max_pieces = max_pieces
+        self.noise = noise
+        self.seed = seed
+        # Games last seconds each, so hand them to the workers one at a time
+        self.farm = farm if farm is not None else SimulationFarm(chunk_size=1)
+        
+        # Search distribution and progress, all saved in the checkpoint
+        self.generation = 0
+        self.mean = weight_vector(None)
+        self.std = [initial_std] * len(FEATURES)
+        self.fitness = {}
+        self.best_weights = self.mean[:]
+        self.best_fitness = None
+        self.history = []
+        
+        if os.path.exists(checkpoint_path):
+            self.load()
+    
+    def load(self):
+        """Restore the tuner state from the checkpoint file"""
+        with open(self.checkpoint_path) as checkpoint:
+            state = json.load(checkpoint)
+        self.generation = state['generation']
+        self.mean = state['mean']
+        self.std = state['std']
+        self.fitness = {int(index): value for index, value in state['fitness'].items()}
+        self.best_weights = state['best_weights']
+        self.best_fitness = state['best_fitness']
+        self.history = state['history']
+    
+    def save(self):
+        """Write the tuner state to the checkpoint file atomically"""
+        state = {
+            'features': list(FEATURES),
+            'generation': self.generation,
+            'mean': self.mean,
+            'std': self.std,
+            'fitness': self.fitness,
+            'best_weights': self.best_weights,
+            'best_fitness': self.best_fitness,
+            'history': self.history
+        }
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w') as checkpoint:
+            json.dump(state, checkpoint, indent=2)
+        os.replace(temp_path, self.checkpoint_path)
+    
+    def sample(self, generation):
+        """Get the candidate weight vectors of a generation"""
+        rng = random.Random(self.seed * 1000003 + generation)
+        return [[rng.gauss(mean, std) for mean, std in zip(self.mean, self.std)]
+                for _ in range(self.population)]
+    
+    def run(self, generations, progress=None):
+        """Tune until the given total number of generations has run; return the best weights"""
+        while self.generation < generations and not self.farm.cancelled:
+            self._run_generation(progress)
+        return self.best_weights
+    
+    def _run_generation(self, progress):
+        """Play the candidates of the current generation and refit the distribution"""
+        candidates = self.sample(self.generation)
+        
+        # Play every game of the candidates that have no fitness yet
+        jobs = []
+        owners = []
+        for index, weights in enumerate(candidates):
+            if index in self.fitness:
+                continue
+            policy = AutoplayBot(weights, depth=1, move_budget=math.inf)
+            for seed in self.game_seeds:
+                jobs.append((seed, policy))
+                owners.append(index)
+        
+        lines = {}
+        for job_index, result in self.farm.run_jobs(jobs, self.max_pieces, progress):
+            index = owners[job_index]
+            lines.setdefault(index, []).append(result['lines'])
+            if len(lines[index]) == len(self.game_seeds):
+                self.fitness[index] = sum(lines[index]) / len(self.game_seeds)
+                self.save()
+        
+        if len(self.fitness) < self.population:
+            return
+        
+        # Refit to the elite, with extra noise that fades over the generations
+        ranked = sorted(range(self.population), key=lambda index: self.fitness[index], reverse=True)
+        elite = [candidates[index] for index in ranked[:self.elite_count]]
+        extra = max(self.noise * (1 - self.generation / 10), 0)
+        for feature in range(len(FEATURES)):
+            values = [weights[feature] for weights in elite]
+            mean = sum(values) / len(values)
+            variance = sum((value - mean) ** 2 for value in values) / len(values)
+            self.mean[feature] = mean
+            self.std[feature] = math.sqrt(variance + extra)
+        
+        best = ranked[0]
+        if self.best_fitness is None or self.fitness[best] > self.best_fitness:
+            self.best_fitness = self.fitness[best]
+            self.best_weights = candidates[best]
+        self.history.append({
+            'generation': self.generation,
+            'best': self.fitness[best],
+            'mean': sum(self.fitness.values()) / self.population
+        })
+        
+        self.generation += 1
+        self.fitness = {}
+        self.save()
+
+def main():
+    """Tune the evaluator weights from the command line"""
+    parser = argparse.ArgumentParser(description="Tune the board evaluator weights in parallel")
+    parser.add_argument('checkpoint', help="checkpoint file, resumed if it exists")
+    parser.add_argument('--generations', type=int, default=20, help="total generations to run")
+    parser.add_argument('--population', type=int, default=32, help="candidates per generation")
+    parser.add_argument('--games', type=int, default=8, help="seeded games per candidate")
+    parser.add_argument('--first-seed', type=int, default=0, help="seed of the first game")
+    parser.add_argument('--max-pieces', type=int, default=500, help="stop each game after this many pieces")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes")
+    parser.add_argument('--seed', type=int, default=0, help="seed for sampling the candidates")
+    args = parser.parse_args()
+    
+    farm = SimulationFarm(workers=args.workers, chunk_size=1)
+    tuner = WeightTuner(args.checkpoint, population=args.population, games=args.games,
+                        first_seed=args.first_seed, max_pieces=args.max_pieces,
+                        seed=args.seed, farm=farm)
+    
+    def report(completed, total):
+        print(f"\rGeneration {tuner.generation}: {completed}/{total} games", end="", flush=True)
+    
+    try:
+        tuner.run(args.generations, progress=report)
+    except KeyboardInterrupt:
+        farm.cancel()
+        print("\nInterrupted, progress is saved in the checkpoint")
+    print()
+    
+    for entry in tuner.history:
+        print(f"Generation {entry['generation']}: best {entry['best']:.2f} lines, "
+              f"mean {entry['mean']:.2f} lines")
+    for name, weight in zip(FEATURES, tuner.best_weights):
+        print(f"{name}: {weight:.4f}")
+
+if __name__ == "__main__":
+    main()
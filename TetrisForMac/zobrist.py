@@ -0,0 +1,56 @@
+"""
+Tetris-like Game for Mac with Apple Silicon
+Zobrist module - provides the random keys used for incremental state hashing
+"""
+
+import random
+
+# Hashes are 64-bit unsigned integers
+HASH_MASK = (1 << 64) - 1
+
+# Largest board the key tables cover
+MAX_BOARD_WIDTH = 64
+MAX_BOARD_HEIGHT = 64
+
+# Pieces may stick out of the board by a few cells while being tested
+POSITION_OFFSET = 8
+
+# Fixed seed so hashes match across runs and processes
+_rng = random.Random(0x7E7215)
+
+def _random_keys(count):
+    """Create a list of random 64-bit keys"""
+    return [_rng.getrandbits(64) for _ in range(count)]
+
+# Board keys: one per (piece kind, column), combined per row with ROW_KEYS
+CELL_KEYS = [_random_keys(MAX_BOARD_WIDTH) for _ in range(7)]
+ROW_KEYS = _random_keys(MAX_BOARD_HEIGHT)
+
+# Active piece keys
+PIECE_KEYS = [_random_keys(4) for _ in range(7)]
+PIECE_X_KEYS = _random_keys(MAX_BOARD_WIDTH + 2 * POSITION_OFFSET)
+PIECE_Y_KEYS = _random_keys(MAX_BOARD_HEIGHT + 2 * POSITION_OFFSET)
+
+# Next piece keys and salts for the unbounded counters
+NEXT_PIECE_KEYS = _random_keys(7)
+LEVEL_SALT = _rng.getrandbits(64)
+COMBO_SALT = _rng.getrandbits(64)
+
+def mix64(value):
+    """Scramble an integer into a 64-bit key (SplitMix64 finalizer)"""
+    value = (value + 0x9E3779B97F4A7C15) & HASH_MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & HASH_MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & HASH_MASK
+    return value ^ (value >> 31)
+
+def row_key(y, row_hash):
+    """Get the contribution of a row with the given contents hash at row y"""
+    if not row_hash:
+        return 0
+    return mix64(row_hash ^ ROW_KEYS[y])
+
+def piece_key(piece):
+    """Get the key of a piece at its current position and rotation"""
+    return (PIECE_KEYS[piece.shape_index][piece.rotation] ^
+            PIECE_X_KEYS[piece.x + POSITION_OFFSET] ^
+            PIECE_Y_KEYS[piece.y + POSITION_OFFSET])